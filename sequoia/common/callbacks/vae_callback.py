@@ -1,7 +1,6 @@
 from dataclasses import dataclass
 from typing import Iterable, Optional
 
-import matplotlib.pyplot as plt
 import numpy as np
 import pytorch_lightning as pl
 import torch
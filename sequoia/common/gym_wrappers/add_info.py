@@ -100,7 +100,6 @@ class AddInfoToObservation(IterableWrapper):
                  env: gym.Env,
                  info_space: spaces.Space = None):
         super().__init__(env)
-        self.is_vectorized = isinstance(env.unwrapped, VectorEnv)
         # TODO: Should we make 'info_space' mandatory here?
         if info_space is None:
             # TODO: There seems to be some issues if we have an empty info space
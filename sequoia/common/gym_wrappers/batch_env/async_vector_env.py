@@ -4,14 +4,19 @@ to be able to interact with the remote workers at a distance.
 import multiprocessing as mp
 import operator
 import platform
+import time
+from concurrent.futures import Future
 from enum import Enum
 from functools import lru_cache, partial, wraps
 from inspect import ismethod
-from multiprocessing.connection import Connection
+from multiprocessing.connection import Connection, wait
+from multiprocessing.reduction import ForkingPickler
 from operator import attrgetter, itemgetter, methodcaller
 from typing import (Any, Callable, ClassVar, Dict, Generic, Iterable, List,
-                    Optional, Sequence, Tuple, Type, TypeVar, Union, overload)
+                    Optional, Sequence, Set, Tuple, Type, TypeVar, Union,
+                    overload)
 
+import cloudpickle
 import gym
 import numpy as np
 from gym import Env, Wrapper
@@ -19,10 +24,12 @@ from gym.vector import AsyncVectorEnv as AsyncVectorEnv_
 from gym.vector.async_vector_env import (AlreadyPendingCallError, AsyncState,
                                          NoAsyncCallError)
 from sequoia.utils.logging_utils import get_logger
+from sequoia.utils.utils import LFUCache
 
 from .tile_images import tile_images
-from .worker import (CloudpickleWrapper, Commands, _custom_worker,
-                     _custom_worker_shared_memory)
+from .worker import (CloudpickleWrapper, Commands, SharedArrayResult,
+                     SharedMemory, SharedPickledResult, _custom_worker,
+                     _custom_worker_shared_memory, encode_apply_command)
 # NOTE: Seems to fix some kind of pytorch-related bug. I can try to find a link
 # to the post about this if needed.
 import os; os.environ['MKL_THREADING_LAYER'] = 'GNU'
@@ -47,6 +54,20 @@ class AsyncVectorEnv(AsyncVectorEnv_, Sequence[EnvType]):
     # things like changing the task or seeding the remote workers, however it
     # adds some complexity, so I'm setting it to False by default. 
     allow_remote_getattr: ClassVar[bool] = False
+    # Maximum number of proxies (one per distinct index) to keep in the cache.
+    proxy_cache_size: ClassVar[int] = 128
+    # Modules to import in the forkserver process before it forks the workers.
+    # The forkserver is started once and reused, so the workers of all the
+    # AsyncVectorEnvs start with these already imported, rather than each
+    # worker importing them again.
+    forkserver_preload: ClassVar[List[str]] = [
+        "numpy",
+        "torch",
+        "gym",
+        "sequoia.common.gym_wrappers.batch_env.worker",
+        # Registers the custom envs (variants of the classic control envs, etc.)
+        "sequoia.settings.rl.envs",
+    ]
     
     def __init__(self,
                  env_fns: Sequence[Callable[[], EnvType]],
@@ -65,6 +86,9 @@ class AsyncVectorEnv(AsyncVectorEnv_, Sequence[EnvType]):
                     f"worker processes will probably be quite a bit slower. "
                 ))
                 context = "spawn"
+        if context == "forkserver":
+            # NOTE: This only has an effect before the forkserver is started.
+            mp.get_context(context).set_forkserver_preload(self.forkserver_preload)
 
         # TODO: @lebrice If we want to be able to add back the cool things we
         # had before, like remotely modifying the envs' attributes, only
@@ -76,21 +100,45 @@ class AsyncVectorEnv(AsyncVectorEnv_, Sequence[EnvType]):
                 worker = _custom_worker_shared_memory
             else:
                 worker = _custom_worker
-        # List that stores wether a function is being applied on an env and we
-        # should expect a result response for that env.
-        self.expects_result: List[bool] = []
+        # Indices of the envs that were sent a function in `apply_async`.
+        self._apply_indices: List[int] = []
+        # Indices of all the envs, used to convert the indices in `__getitem__`.
+        self._env_indices = np.arange(len(env_fns), dtype=np.intp)
+        self._env_indices_tuple: Tuple[int, ...] = tuple(range(len(env_fns)))
+        # Functions that were registered on the workers, indexed by their id,
+        # and a mapping from `id(function)` to that index.
+        self._registered_functions: List[Callable] = []
+        self._function_ids: Dict[int, int] = {}
+        # Shared memory buffers of the workers, used to receive large arrays.
+        self._result_buffers: Dict[str, SharedMemory] = {}
+        # The active `BatchingContext`, if any (see `batch`).
+        self._batching: Optional[BatchingContext] = None
+        # Cache of the proxies returned by `__getitem__`, keyed by index.
+        self._proxies: LFUCache[Union[int, Tuple[int, ...]], EnvType] = LFUCache(
+            maxsize=self.proxy_cache_size
+        )
+        # The attributes that all the envs were found to have in `__getattr__`.
+        # NOTE: Failed lookups aren't cached, since the attribute could be created
+        # on the envs later on (e.g. in `reset`, `step` or `apply`).
+        self._remote_attributes: LFUCache[str, bool] = LFUCache(maxsize=self.proxy_cache_size)
+        # Memo of the tuples of indices for the arrays passed to `__getitem__`.
+        self._array_indices: LFUCache[Tuple[str, bytes], Tuple[int, ...]] = LFUCache(
+            maxsize=self.proxy_cache_size
+        )
 
         # Important, this must be done before the call to super().__init__
         from sequoia.common.spaces.sparse import Sparse
         
         super().__init__(
-            env_fns=env_fns,
+            env_fns=prepickle_env_fns(env_fns),
             context=context,
             worker=worker,
             shared_memory=shared_memory,
             **kwargs
         )
         self.viewer = None
+        for function in REGISTERED_FUNCTIONS:
+            self.register_function(function)
 
     def random_actions(self) -> Tuple:
         return self.action_space.sample()
@@ -99,7 +147,11 @@ class AsyncVectorEnv(AsyncVectorEnv_, Sequence[EnvType]):
         return self.num_envs
 
     def close_extras(self, timeout=None, terminate=False):
+        self.clear_proxy_cache()
         super().close_extras(timeout=timeout, terminate=terminate)
+        for buffer in self._result_buffers.values():
+            buffer.close()
+        self._result_buffers.clear()
         if self.viewer:
             self.viewer.close()
             
@@ -142,7 +194,9 @@ class AsyncVectorEnv(AsyncVectorEnv_, Sequence[EnvType]):
         ...
 
     def apply(self,
-              functions: Union[Callable[[Env], T], Sequence[Optional[Callable[[Env], T]]]],
+              functions: Union[Callable[[Env], T],
+                               Sequence[Optional[Callable[[Env], T]]],
+                               Dict[int, Callable[[Env], T]]],
               timeout: float = None) -> List[T]:
         """ Send a function down to the workers for them to apply to their
         environments, and returns the corresponding results.
@@ -151,57 +205,176 @@ class AsyncVectorEnv(AsyncVectorEnv_, Sequence[EnvType]):
         When given a list of functions, apples each function to each env.
         When given a list where some items aren't callables, e.g. None, doesn't
         apply any function for that particular env.
+        When given a dict mapping from env index to function, only applies the
+        functions to the envs at these indices.
         """
         self.apply_async(functions)
         return self.apply_wait(timeout=timeout)
 
-    def apply_async(self, functions: Union[Callable[[Env], Any], Sequence[Callable[[Env], Any]]]):
+    def register_function(self, function: Callable[..., Any]) -> int:
+        """ Registers `function` on all the workers, and returns its id.
+
+        Calls to `apply` with a registered function, or with a `partial` of
+        one, then only need to send that id (and the partial's arguments)
+        rather than having to pickle the function each time.
+        """
+        function_id = self._function_ids.get(id(function))
+        if function_id is not None:
+            return function_id
         self._assert_is_running()
         if self._state != AsyncState.DEFAULT:
-            raise AlreadyPendingCallError('Calling `apply` while waiting '
-                'for a pending call to `{0}` to complete.'.format(
+            raise AlreadyPendingCallError('Calling `register_function` while '
+                'waiting for a pending call to `{0}` to complete.'.format(
                 self._state.value), self._state.value)
 
+        function_id = len(self._registered_functions)
+        for pipe in self.parent_pipes:
+            pipe.send((Commands.register, (function_id, function)))
+        _, successes = zip(*[pipe.recv() for pipe in self.parent_pipes])
+        self._raise_if_errors(successes)
+        # NOTE: Keeping a reference to the function, so its `id` can't be reused.
+        self._registered_functions.append(function)
+        self._function_ids[id(function)] = function_id
+        return function_id
+
+    def _apply_command(self, function: Callable[[Env], Any]) -> Tuple[str, Any]:
+        """ Returns the command to send to a worker to apply `function` to its
+        env, using the function's id if it (or the function it wraps, in the
+        case of a `partial`) was registered.
+        """
+        function_id = self._function_ids.get(id(function))
+        if function_id is not None:
+            return Commands.apply_registered, (function_id, (), {})
+        if isinstance(function, partial):
+            function_id = self._function_ids.get(id(function.func))
+            if function_id is not None:
+                return Commands.apply_registered, (function_id, function.args, function.keywords)
+        return Commands.apply, function
+
+    def apply_async(self,
+                    functions: Union[Callable[[Env], Any],
+                                     Sequence[Optional[Callable[[Env], Any]]],
+                                     Dict[int, Callable[[Env], Any]]]):
         if callable(functions):
             functions = [functions] * self.num_envs
-        assert len(functions) == self.num_envs, "Need a function for each env."
+        if not isinstance(functions, dict):
+            assert len(functions) == self.num_envs, "Need a function for each env."
+            functions = {
+                index: function for index, function in enumerate(functions)
+                if callable(function)
+            }
+        # Encode the message for each distinct function only once, since the
+        # same function is usually sent to many (or all) of the workers.
+        messages: Dict[int, bytes] = {}
+        for function in functions.values():
+            if id(function) not in messages:
+                messages[id(function)] = encode_apply_command(*self._apply_command(function))
+        self._send_apply_messages({
+            index: messages[id(function)] for index, function in functions.items()
+        })
+
+    def apply_batch(self,
+                    functions: Sequence[Optional[Sequence[Callable[[Env], Any]]]],
+                    timeout: float = None) -> List[Optional[List[Any]]]:
+        """ Applies a list of functions to each env, using a single round-trip
+        per worker, and returns the list of results for each env.
+
+        When the list of functions for an env is None or empty, doesn't send
+        anything to that env, and its results are None.
+        """
+        self.apply_batch_async(functions)
+        return self.apply_wait(timeout=timeout)
 
-        self.expects_result.clear()
-        for pipe, function in zip(self.parent_pipes, functions):
-            if callable(function):
-                self.expects_result.append(True)
-                pipe.send((Commands.apply, function))
-            else:
-                self.expects_result.append(False)
+    def apply_batch_async(self, functions: Sequence[Optional[Sequence[Callable[[Env], Any]]]]):
+        assert len(functions) == self.num_envs, "Need a list of functions for each env."
+        self._send_apply_messages({
+            index: encode_apply_command(
+                Commands.apply_batch, [self._apply_command(f) for f in env_functions]
+            )
+            for index, env_functions in enumerate(functions) if env_functions
+        })
+
+    def _send_apply_messages(self, messages: Dict[int, bytes]):
+        """ Sends the given encoded commands (see `encode_apply_command`) to the
+        workers at the corresponding indices.
+
+        The results can then be retrieved with `apply_wait`.
+        """
+        self._assert_is_running()
+        if self._state != AsyncState.DEFAULT:
+            raise AlreadyPendingCallError('Calling `apply` while waiting '
+                'for a pending call to `{0}` to complete.'.format(
+                self._state.value), self._state.value)
+
+        self._apply_indices = list(messages)
+        for index, message in messages.items():
+            self.parent_pipes[index].send_bytes(message)
         self._state = ExtendedAsyncState.WAITING_APPLY
-        
+
     def apply_wait(self, timeout: float = None) -> List[Optional[Any]]:
-        # Could split this into an 'apply_async' and 'apply_wait' if we wanted
-        # to. setting the self._state attribute isn't really needed here.
+        results = self._apply_wait(timeout=timeout)
+        return [results.get(index) for index in range(self.num_envs)]
+
+    def _apply_wait(self, timeout: float = None) -> Dict[int, Any]:
+        """ Waits for the results of the functions sent with `apply_async`,
+        and returns a dict mapping from env index to result.
+        """
         self._assert_is_running()
         if self._state != ExtendedAsyncState.WAITING_APPLY:
             raise NoAsyncCallError('Calling `apply_wait` without any prior call '
                 'to `step_async`.', ExtendedAsyncState.WAITING_APPLY.value)
 
-        if not self._poll(timeout):
-            self._state = AsyncState.DEFAULT
-            raise mp.TimeoutError('The call to `apply_wait` has timed out after '
-                '{0} second{1}.'.format(timeout, 's' if timeout > 1 else ''))
-        
-        results: List[Any] = []
-        successes: List[bool] = []
-        pipe: Connection
-        for pipe, need_result in zip(self.parent_pipes, self.expects_result):
-            if need_result:
-                result, success = pipe.recv()
-            else:
-                result, success = None, True
-            results.append(result)
-            successes.append(success)
-
-        self._raise_if_errors(successes)
+        results: Dict[int, Any] = {}
+        successes: Dict[int, bool] = {}
+        # Receive the results as they arrive, rather than in order, so the
+        # results of the fast workers don't wait behind those of a slow one.
+        pending: Dict[Connection, int] = {
+            self.parent_pipes[index]: index for index in self._apply_indices
+        }
+        end_time = None if timeout is None else time.perf_counter() + timeout
+        while pending:
+            remaining = None if end_time is None else max(end_time - time.perf_counter(), 0)
+            ready_pipes = wait(list(pending), timeout=remaining)
+            if not ready_pipes:
+                self._state = AsyncState.DEFAULT
+                raise mp.TimeoutError('The call to `apply_wait` has timed out after '
+                    '{0} second{1}.'.format(timeout, 's' if timeout > 1 else ''))
+            pipe: Connection
+            for pipe in ready_pipes:
+                index = pending.pop(pipe)
+                result, successes[index] = pipe.recv()
+                if isinstance(result, SharedArrayResult):
+                    result = self._read_shared_array(result)
+                elif isinstance(result, SharedPickledResult):
+                    result, successes[index] = self._read_shared_pickle(result)
+                results[index] = result
+
+        if not all(successes.values()):
+            self._raise_if_errors([successes.get(i, True) for i in range(self.num_envs)])
         self._state = AsyncState.DEFAULT
-        return list(results)
+        return results
+
+    def _get_result_buffer(self, buffer_name: str) -> SharedMemory:
+        """ Returns the shared memory buffer that a worker uses to send results. """
+        buffer = self._result_buffers.get(buffer_name)
+        if buffer is None:
+            buffer = SharedMemory(name=buffer_name)
+            self._result_buffers[buffer_name] = buffer
+        return buffer
+
+    def _read_shared_array(self, result: SharedArrayResult) -> np.ndarray:
+        """ Reads an array that a worker wrote to its shared memory buffer. """
+        buffer = self._get_result_buffer(result.buffer_name)
+        array = np.ndarray(result.shape, dtype=np.dtype(result.dtype), buffer=buffer.buf)
+        # NOTE: Need to copy the array, since the worker reuses the buffer.
+        return array.copy()
+
+    def _read_shared_pickle(self, result: SharedPickledResult) -> Tuple[Any, bool]:
+        """ Unpickles a (result, success) tuple that a worker wrote to its shared
+        memory buffer.
+        """
+        buffer = self._get_result_buffer(result.buffer_name)
+        return ForkingPickler.loads(buffer.buf[:result.nbytes])
 
     @overload
     def apply_at(self, operation: Callable[[EnvType], T], index: int) -> T:
@@ -214,46 +387,78 @@ class AsyncVectorEnv(AsyncVectorEnv_, Sequence[EnvType]):
     def apply_at(self,
                  operation: Callable[[EnvType], T],
                  index: Union[int, Sequence[int]]) -> Union[T, List[T]]:
-        """ Applies `operation` to the envs at `index`. """
-        indices = [index] if isinstance(index, int) else index
-        operations = [
-            operation if i in indices else None for i in range(self.num_envs)
-        ]
-        results: List[Optional[T]] = self.apply(operations)
-        assert len(results) == self.num_envs
+        """ Applies `operation` to the envs at `index`.
+
+        When inside a `batch()` block, the operation is deferred, and a
+        `Future` is returned instead of the result.
+        """
+        if self._batching is not None:
+            return self._batching.add(operation, index)
+        # Only send the operation to the envs at these indices.
+        self.apply_async({i: operation for i in _target_indices(index)})
+        results: Dict[int, T] = self._apply_wait()
 
         if isinstance(index, int):
             # If we wanted a proxy for a single item, then we return a
             # single result, instead of a list with one item.
             return results[index]
-        return [result for i, result in enumerate(results) if i in indices]
+        return [results[i] for i in sorted(results)]
+
+
+    def batch(self) -> "BatchingContext":
+        """ Returns a context manager in which the operations on the env proxies
+        (e.g. `env[0].length = 2.0` or `env[:].length`) are deferred, and then
+        sent all at once when exiting, with a single round-trip per worker.
+
+        Inside the block, these operations return a `Future`, whose result is
+        set when exiting the block:
+
+        ```python
+        with env.batch():
+            env[0].length = 2.0
+            lengths = env[:].length
+        assert lengths.result()[0] == 2.0
+        ```
 
+        The results are the same as outside the block, e.g. `env[[1, 0]].length`
+        gives the lengths of envs 0 and 1, in that order.
+
+        NOTE: Remote methods can't be called inside the block: `env[:].reset` gives
+        a `Future` rather than a batched method, since whether the attribute is a
+        method is only known once the block exits.
+        """
+        return BatchingContext(self)
 
     def __getattr__(self, name: str):
         if name in {"closed", "_state"}:
             return
 
-        if not type(self).allow_remote_getattr:
+        if not type(self).allow_remote_getattr or name.startswith("_"):
+            # NOTE: Private and 'dunder' attributes are never fetched from the
+            # envs, since libraries often probe for those (e.g. `__wrapped__`).
             raise AttributeError(name)
-        
-        logger.debug(f"Attempting to get missing attribute {name}.")
-        
+
         assert isinstance(name, str)
-        env_has_attribute = self.apply(partial(hasattr_, name=name))
-        if all(env_has_attribute):
+        envs_have_attribute = self._remote_attributes.get(name)
+        if envs_have_attribute is None:
+            logger.debug(f"Attempting to get missing attribute {name}.")
+            envs_have_attribute = all(self.apply(partial(hasattr_, name=name)))
+            if envs_have_attribute:
+                self._remote_attributes[name] = True
+        if envs_have_attribute:
             self._assert_is_running()
             return getattr(self[:], name)
         raise AttributeError(name)
 
     def __getitem__(self, index: Union[int, slice, Sequence[int]]) -> EnvType:
         if isinstance(index, slice):
-            index = tuple(range(self.num_envs))[index]
+            index = self._env_indices_tuple[index]
+        elif isinstance(index, np.integer):
+            index = int(index)
         elif isinstance(index, list):
             index = tuple(index)
         elif isinstance(index, np.ndarray):
-            if index.dtype == np.bool:
-                index = np.arange(self.num_envs)[index]
-            index = tuple(index.tolist())
+            index = self.__array_index_to_tuple(index)
         elif not isinstance(index, int):
             try:
                 index = tuple(index)
@@ -261,11 +466,42 @@ class AsyncVectorEnv(AsyncVectorEnv_, Sequence[EnvType]):
                 raise RuntimeError(f"Bad index: {index}")
         return self.__get_env_proxy(index)
 
-    @lru_cache()
+    def __array_index_to_tuple(self, index: np.ndarray) -> Tuple[int, ...]:
+        """ Converts a boolean mask or an array of indices into a tuple of ints.
+
+        The conversions are memoized using the array's bytes as the key, so that
+        indexing with the same mask at every step doesn't create new ints.
+        """
+        key = (index.dtype.str, index.tobytes())
+        try:
+            return self._array_indices[key]
+        except KeyError:
+            pass
+        # NOTE: Indexing the array of env indices also checks the length of the
+        # mask, checks the bounds and wraps the negative indices.
+        result = tuple(self._env_indices[index].ravel().tolist())
+        self._array_indices[key] = result
+        return result
+
+    def clear_proxy_cache(self) -> None:
+        """ Removes all the proxies created by `__getitem__` from the cache. """
+        self._proxies.clear()
+        self._array_indices.clear()
+
     def __get_env_proxy(self, index: Union[int, Tuple[int, ...]]) -> EnvType:
         """ Returns a Proxy object that will get/set attributes on the remote
         environments at the given indices.
+
+        The proxies are cached, keeping only the most frequently used ones.
         """
+        try:
+            return self._proxies[index]
+        except KeyError:
+            proxy = self.__make_env_proxy(index)
+            self._proxies[index] = proxy
+            return proxy
+
+    def __make_env_proxy(self, index: Union[int, Tuple[int, ...]]) -> EnvType:
         apply_at_indices = partial(self.apply_at, index=index)
         from .batched_method import BatchedMethod
 
@@ -276,12 +512,15 @@ class AsyncVectorEnv(AsyncVectorEnv_, Sequence[EnvType]):
             the methods below, I marked all the methods as static.
             TODO: Maybe be useful to read-up on the descriptor protocol.
             """
+            # The proxy doesn't have any state of its own.
+            __slots__ = ()
+
             @staticmethod
             def __getattribute__(name: str) -> List:
                 """ Gets the attribute from the corresponding remote env, rather
                 than from this proxy object.
                 """
-                results = apply_at_indices(attrgetter(name))
+                results = apply_at_indices(remote_getter(name))
                 if isinstance(results, list) and all(map(ismethod, results)):
                     # Detect when the requested attributes are methods, and then
                     # batch the methods!
@@ -296,21 +535,24 @@ class AsyncVectorEnv(AsyncVectorEnv_, Sequence[EnvType]):
                 # TODO: IF the value is a list, and index is a tuple of more
                 # than one value, then maybe split the value up to set a
                 # different slice of it on each env ?
+                self._remote_attributes.pop(name, None)
                 return apply_at_indices(partial(set_wrapper_attribute, name=name, value=value))
 
             @staticmethod
             def getattributes(*name: str) -> List:
                 """ Bulk getattr to save some latency. """
-                return apply_at_indices(attrgetter(*name))
+                return apply_at_indices(partial(getattrs_, names=name))
 
             @staticmethod
             def setattributes(**names_and_values):
                 """ Bulk setattr to save some latency. """
+                for name in names_and_values:
+                    self._remote_attributes.pop(name, None)
                 return apply_at_indices(partial(setattrs, **names_and_values))
 
             @staticmethod
             def __getitem__(index: int):
-                return apply_at_indices(itemgetter(index))
+                return apply_at_indices(partial(getitem_, index=index))
             # Pretty sure this wouldn't be used, but just trying to see if
             # there's a pattern here we can make use of, hopefully involving the
             # use of `methodcaller` from the `operator` package!
@@ -328,6 +570,146 @@ class AsyncVectorEnv(AsyncVectorEnv_, Sequence[EnvType]):
             " env, something like that."
         )
 
+class BatchingContext:
+    """ Defers the operations made through the proxies of an AsyncVectorEnv,
+    and applies all of them with a single `apply_batch` when exiting.
+
+    Created using `AsyncVectorEnv.batch()`.
+    """
+    def __init__(self, env: AsyncVectorEnv):
+        self.env = env
+        self.operations: List[Tuple[Callable, Union[int, Tuple[int, ...]], Future]] = []
+
+    def __enter__(self) -> "BatchingContext":
+        if self.env._batching is not None:
+            raise RuntimeError("Already inside a `batch()` block.")
+        self.env._batching = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.env._batching = None
+        if exc_type is None:
+            self.flush()
+        else:
+            for _, _, future in self.operations:
+                future.cancel()
+            self.operations.clear()
+
+    def add(self, operation: Callable[[Env], Any], index: Union[int, Sequence[int]]) -> Future:
+        """ Adds an operation to apply on the envs at `index`, and returns a
+        Future for its result.
+        """
+        future: Future = Future()
+        self.operations.append((operation, index, future))
+        return future
+
+    def flush(self) -> None:
+        """ Applies all the pending operations, and sets the results of their
+        futures.
+        """
+        operations, self.operations = self.operations, []
+        if not operations:
+            return
+        functions: List[List[Callable]] = [[] for _ in range(self.env.num_envs)]
+        for operation, index, _ in operations:
+            for i in _target_indices(index):
+                functions[i].append(operation)
+        try:
+            results = self.env.apply_batch(functions)
+        except Exception as exc:
+            for _, _, future in operations:
+                future.set_exception(exc)
+            raise
+        # The results for each env are in the same order as the operations.
+        env_results = [iter(results_i or []) for results_i in results]
+        for _, index, future in operations:
+            if isinstance(index, int):
+                future.set_result(next(env_results[index]))
+            else:
+                future.set_result([next(env_results[i]) for i in _target_indices(index)])
+
+
+def _target_indices(index: Union[int, Sequence[int]]) -> List[int]:
+    """ Returns the indices of the envs targeted by an `apply_at` index.
+
+    Like the results of `apply_at`, these are sorted, and without duplicates.
+    """
+    if isinstance(index, int):
+        return [index]
+    return sorted(set(index))
+
+
+class PrepickledEnvFn:
+    """ Env factory that carries its own cloudpickled bytes, so that pickling it
+    (once per worker) doesn't have to pickle the whole factory again.
+
+    When unpickled, this gives back the original env factory.
+    """
+    __slots__ = ("env_fn", "payload")
+
+    def __init__(self, env_fn: Callable[[], Env], payload: bytes):
+        self.env_fn = env_fn
+        self.payload = payload
+
+    def __call__(self) -> Env:
+        return self.env_fn()
+
+    def __reduce__(self):
+        return cloudpickle.loads, (self.payload,)
+
+
+def prepickle_env_fns(env_fns: Sequence[Callable[[], Env]]) -> List[PrepickledEnvFn]:
+    """ Pickles each distinct env factory only once.
+
+    The same factory is usually used for all the envs (e.g. in `make_batched_env`),
+    and it can have a large graph of wrappers and closures to pickle.
+    """
+    payloads: Dict[int, bytes] = {}
+    prepickled: List[PrepickledEnvFn] = []
+    for env_fn in env_fns:
+        if isinstance(env_fn, PrepickledEnvFn):
+            prepickled.append(env_fn)
+            continue
+        if id(env_fn) not in payloads:
+            payloads[id(env_fn)] = cloudpickle.dumps(env_fn)
+        prepickled.append(PrepickledEnvFn(env_fn, payloads[id(env_fn)]))
+    return prepickled
+
+
+def getattr_(obj, name: str) -> Any:
+    """ Version of 'getattr' that accepts keyword arguments, for use with partial.
+
+    Like `attrgetter`, this also accepts dotted names, e.g. "unwrapped.length".
+    """
+    if "." in name:
+        return attrgetter(name)(obj)
+    # NOTE: Most names aren't dotted, and calling the builtin directly avoids
+    # creating a new attrgetter on each call.
+    return getattr(obj, name)
+
+
+@lru_cache(maxsize=1024)
+def remote_getter(name: str) -> Callable[[Any], Any]:
+    """ Returns a `partial(getattr_, name=name)`, reusing the same object for
+    each name rather than creating a new one on each attribute access.
+
+    Since `getattr_` is registered on the workers, this is sent as the id of
+    `getattr_` along with the name, rather than as a pickled function.
+    """
+    return partial(getattr_, name=name)
+
+
+def getattrs_(obj, names: Sequence[str]) -> Any:
+    """ Equivalent to `attrgetter(*names)(obj)`, for use with partial. """
+    return attrgetter(*names)(obj)
+
+
+def getitem_(obj, index: Any) -> Any:
+    """ Version of 'getitem' that accepts keyword arguments, for use with partial.
+    """
+    return obj[index]
+
+
 def hasattr_(obj, name) -> None:
     """ Version of 'hasattr' that accepts keyword arguments, for use with partial.
     """
@@ -368,9 +750,9 @@ def set_wrapper_attribute(env: Env, name: str, value: Any) -> Type[Env]:
     wrapper has an attribute with that name.
     """
     # Keep track of seen envs to avoids infinite loops because of cycles.
-    wrappers = []
-    while not hasattr(env, name) and hasattr(env, "env") and env not in wrappers:
-        wrappers.append(env)
+    seen_ids: Set[int] = set()
+    while not hasattr(env, name) and hasattr(env, "env") and id(env) not in seen_ids:
+        seen_ids.add(id(env))
         env = env.env
     setattr(env, name, value)
     return type(env)
@@ -381,3 +763,17 @@ def set_wrapper_attributes(env: Env, **names_and_values) -> Dict[str, Type[Env]]
     for name, value in names_and_values.items():
         results[name] = set_wrapper_attribute(env, name, value)
     return results
+
+
+# Functions that get registered on the workers of every AsyncVectorEnv, since they
+# are used (through `partial`) by the env proxies.
+REGISTERED_FUNCTIONS: Tuple[Callable, ...] = (
+    getattr_,
+    getattrs_,
+    getitem_,
+    hasattr_,
+    setattr_,
+    setattrs,
+    set_wrapper_attribute,
+    set_wrapper_attributes,
+)
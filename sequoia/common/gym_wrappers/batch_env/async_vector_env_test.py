@@ -191,3 +191,222 @@ def test_batched_method_call(batch_size: int, allow_remote_getattr):
         assert new_lengths == [1.5, 1.5]
         lengths = env.length
         assert lengths == [1.5, 1.5] + [0.5 for i in range(2, batch_size)]
+
+
+def get_scaled_length(env: Env, coef: float = 1.0) -> float:
+    return env.length * coef
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 5])
+def test_register_function(batch_size: int):
+    env_fns = [partial(gym.make, "CartPole-v0") for _ in range(batch_size)]
+    with AsyncVectorEnv(env_fns=env_fns) as env:
+        function_id = env.register_function(get_scaled_length)
+        # Registering the same function twice gives back the same id.
+        assert env.register_function(get_scaled_length) == function_id
+
+        assert env.apply(get_scaled_length) == [0.5 for i in range(batch_size)]
+        # Partials of a registered function are also sent using the id.
+        results = env.apply(partial(get_scaled_length, coef=2.0))
+        assert results == [1.0 for i in range(batch_size)]
+
+
+@pytest.mark.parametrize("batch_size", [2, 5])
+def test_batch(batch_size: int):
+    env_fns = [partial(gym.make, "CartPole-v0") for _ in range(batch_size)]
+    with AsyncVectorEnv(env_fns=env_fns) as env:
+        with env.batch():
+            env[0].length = 2.0
+            lengths = env[:].length
+            first_length = env[0].length
+            # Nothing gets sent to the workers before exiting the block.
+            assert not lengths.done()
+        assert lengths.result() == [2.0 if i == 0 else 0.5 for i in range(batch_size)]
+        assert first_length.result() == 2.0
+
+        results = env.apply_batch(
+            [[attrgetter("length"), attrgetter("gravity")], None] + [None] * (batch_size - 2)
+        )
+        assert results == [[2.0, 9.8]] + [None] * (batch_size - 1)
+
+
+def test_batch_same_results_as_apply_at():
+    """ Results are the same inside and outside a `batch()` block, including for
+    unsorted indices with duplicates.
+    """
+    env_fns = [partial(gym.make, "CartPole-v0") for _ in range(3)]
+    with AsyncVectorEnv(env_fns=env_fns) as env:
+        env[1].length = 2.0
+        index = (2, 1, 1)
+        expected = env[index].length
+        assert expected == [2.0, 0.5]
+        with env.batch():
+            lengths = env[index].length
+        assert lengths.result() == expected
+
+
+def get_large_array(env: Env) -> np.ndarray:
+    return np.full((256, 256), env.length, dtype=np.float64)
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 5])
+def test_apply_large_array_result(batch_size: int):
+    """ Large arrays are sent back through shared memory rather than the pipes. """
+    env_fns = [partial(gym.make, "CartPole-v0") for _ in range(batch_size)]
+    with AsyncVectorEnv(env_fns=env_fns) as env:
+        env[0].length = 2.0
+        for _ in range(2):
+            results = env.apply(get_large_array)
+            assert len(results) == batch_size
+            for i, result in enumerate(results):
+                assert isinstance(result, np.ndarray)
+                assert result.shape == (256, 256)
+                assert (result == (2.0 if i == 0 else 0.5)).all()
+
+
+def get_large_record_array(env: Env) -> np.ndarray:
+    result = np.zeros(10_000, dtype=[("length", np.float64), ("step", np.int64)])
+    result["length"] = env.length
+    result["step"] = np.arange(10_000)
+    return result
+
+
+def test_apply_large_structured_array_result():
+    """ Arrays with a structured dtype keep their fields when sent back. """
+    env_fns = [partial(gym.make, "CartPole-v0") for _ in range(2)]
+    with AsyncVectorEnv(env_fns=env_fns) as env:
+        env[0].length = 2.0
+        results = env.apply(get_large_record_array)
+        for i, result in enumerate(results):
+            assert result.dtype.names == ("length", "step")
+            assert (result["length"] == (2.0 if i == 0 else 0.5)).all()
+            assert (result["step"] == np.arange(10_000)).all()
+
+
+def test_decode_command_caches_functions():
+    from sequoia.utils.utils import LFUCache
+    from .worker import Commands, decode_command, encode_apply_command
+
+    function_cache = LFUCache(maxsize=2)
+    message = encode_apply_command(Commands.apply, attrgetter("length"))
+    command, first = decode_command(message, function_cache)
+    assert command == Commands.apply
+    # The same message gives back the same (cached) function.
+    _, second = decode_command(message, function_cache)
+    assert second is first
+    assert len(function_cache) == 1
+
+
+class Store:
+    def store(self, value: list) -> None:
+        self.value = value
+
+
+def test_decode_command_doesnt_share_call_arguments():
+    """ Functions that carry arguments (e.g. the `methodcaller` of a batched method
+    call) are not cached, so identical calls don't share the same argument objects.
+    """
+    from operator import methodcaller
+    from sequoia.utils.utils import LFUCache
+    from .worker import Commands, decode_command, encode_apply_command
+
+    function_cache = LFUCache(maxsize=2)
+    message = encode_apply_command(Commands.apply, methodcaller("store", []))
+    first_store, second_store = Store(), Store()
+    _, first = decode_command(message, function_cache)
+    first(first_store)
+    first_store.value.append(1)
+    _, second = decode_command(message, function_cache)
+    second(second_store)
+    assert second_store.value == []
+    assert second_store.value is not first_store.value
+    assert len(function_cache) == 0
+
+
+def get_large_list(env: Env) -> list:
+    return [env.length] * 100_000
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 5])
+def test_apply_large_pickled_result(batch_size: int):
+    """ Large results that aren't arrays are also sent back through shared memory. """
+    env_fns = [partial(gym.make, "CartPole-v0") for _ in range(batch_size)]
+    with AsyncVectorEnv(env_fns=env_fns) as env:
+        env[0].length = 2.0
+        for _ in range(2):
+            results = env.apply(get_large_list)
+            assert results == [
+                [2.0 if i == 0 else 0.5] * 100_000 for i in range(batch_size)
+            ]
+
+
+def set_baz(env: gym.Env) -> None:
+    env.unwrapped.baz = 3
+
+
+@pytest.mark.parametrize("batch_size", [1, 3])
+def test_remote_attributes_cache_invalidated_on_set(batch_size: int, allow_remote_getattr):
+    """ The cached results of the remote attribute probes in `__getattr__` are
+    invalidated when the attribute is set through a proxy, and failed lookups aren't
+    cached.
+    """
+    env_fns = [partial(gym.make, "CartPole-v0") for _ in range(batch_size)]
+    with AsyncVectorEnv(env_fns=env_fns) as env:
+        assert env.length == [0.5] * batch_size
+        assert env._remote_attributes["length"] is True
+
+        with pytest.raises(AttributeError):
+            _ = env.foo
+        assert "foo" not in env._remote_attributes
+        env[:].foo = 1
+        assert "foo" not in env._remote_attributes
+        assert env.foo == [1] * batch_size
+
+        with pytest.raises(AttributeError):
+            _ = env.bar
+        env[:].setattributes(bar=2)
+        assert "bar" not in env._remote_attributes
+        assert env.bar == [2] * batch_size
+
+        # An attribute created on the envs after a failed lookup is found.
+        with pytest.raises(AttributeError):
+            _ = env.baz
+        env.apply(set_baz)
+        assert env.baz == [3] * batch_size
+
+
+class Inner:
+    def __init__(self):
+        self.length = 0.5
+
+
+class Outer:
+    def __init__(self, env):
+        self.env = env
+
+
+class OuterWithLength(Outer):
+    length = 1.0
+
+
+def test_set_wrapper_attribute_sets_on_first_wrapper_with_attribute():
+    """ `set_wrapper_attribute` sets the attribute on the first wrapper that has it,
+    even when envs with the same outer type have different wrappers below it.
+    """
+    from .async_vector_env import set_wrapper_attribute
+
+    env = Outer(Outer(Inner()))
+    assert set_wrapper_attribute(env, "length", 2.0) is Inner
+    assert env.env.env.length == 2.0
+    assert "length" not in vars(env) and "length" not in vars(env.env)
+
+    # Same outer type, but with a shallower wrapper that has the attribute.
+    other_env = Outer(OuterWithLength(Inner()))
+    assert set_wrapper_attribute(other_env, "length", 3.0) is OuterWithLength
+    assert other_env.env.length == 3.0
+    assert other_env.env.env.length == 0.5
+
+    # Same outer type, with a shallower unwrapped env.
+    shallow_env = Outer(Inner())
+    assert set_wrapper_attribute(shallow_env, "length", 4.0) is Inner
+    assert shallow_env.env.length == 4.0
@@ -104,11 +104,18 @@ class BatchedVectorEnv(VectorEnv):
         self.n_b = sum(map(len, groups[self.start_index_b:]))
 
         # Create a SyncVectorEnv per group.
+        # NOTE: The SyncVectorEnvs don't need to copy their observations, since the
+        # worker sends them (or writes them to shared memory) right away.
         chunk_env_fns: List[Callable[[], gym.Env]] = [
-            partial(SyncVectorEnv, env_fns_group) for env_fns_group in groups
+            partial(SyncVectorEnv, env_fns_group, copy=False) for env_fns_group in groups
         ]
         env_a_fns = chunk_env_fns[:self.start_index_b]
         env_b_fns = chunk_env_fns[self.start_index_b:]
+        if isinstance(single_observation_space, spaces.Box):
+            # NOTE: The observations are always copied into a new batch in
+            # `fuse_and_batch`, so the AsyncVectorEnvs can give back views of their
+            # shared memory rather than copying the observations out of it first.
+            kwargs.setdefault("copy", False)
         # Create the AsyncVectorEnvs.
         self.env_a = AsyncVectorEnv(env_fns=env_a_fns, **kwargs)
         self.env_b: Optional[AsyncVectorEnv] = None
@@ -295,11 +302,16 @@ def fuse_and_batch(item_space: spaces.Space, *sequences: Sequence[Sequence[T]],
     # sequence_a, sequence_b = sequences
     assert all(isinstance(sequence, list) for sequence in sequences)
     out = create_empty_array(item_space, n=n_items)
-    # # Concatenate the (two) batches into a single batch of samples.
-    items_batch = np.concatenate([
+    arrays = [
         np.asarray(v).reshape([-1, *item_space.shape])
         for v in itertools.chain(*sequences)
-    ])
+    ]
+    if isinstance(out, np.ndarray) and out.shape == (n_items, *item_space.shape):
+        # Concatenate the items directly into the output batch, rather than
+        # concatenating them, splitting them, and then stacking them again.
+        return np.concatenate(arrays, axis=0, out=out)
+    # # Concatenate the (two) batches into a single batch of samples.
+    items_batch = np.concatenate(arrays)
     # # Split this batch of samples into a list of items from each space.
     items = [
         v.reshape(item_space.shape) for v in np.split(items_batch, n_items)
@@ -272,3 +272,29 @@ def benchmark(
     time_per_step = (time.time() - run_start) / n_steps
     return setup_time, time_per_step
 
+
+
+@pytest.mark.parametrize("input_dtype", [np.float64, np.int64])
+def test_fuse_and_batch_casts_to_space_dtype(input_dtype):
+    """ `fuse_and_batch` concatenates the chunks directly into a batch with the dtype
+    of the space, even when the chunks have a different dtype.
+    """
+    from .batched_vector_env import fuse_and_batch
+
+    item_space = spaces.Box(low=-10, high=10, shape=(4,), dtype=np.float32)
+    chunks_a = [np.ones((2, 4), dtype=input_dtype), np.zeros((1, 4), dtype=input_dtype)]
+    chunks_b = [np.full((2, 4), 2, dtype=input_dtype)]
+    batch = fuse_and_batch(item_space, chunks_a, chunks_b, n_items=5)
+    assert isinstance(batch, np.ndarray)
+    assert batch.dtype == np.float32
+    assert batch.shape == (5, 4)
+    np.testing.assert_array_equal(batch[:, 0], [1, 1, 0, 2, 2])
+    assert not any(np.shares_memory(batch, chunk) for chunk in chunks_a + chunks_b)
+
+
+def test_fuse_and_batch_discrete():
+    from .batched_vector_env import fuse_and_batch
+
+    batch = fuse_and_batch(spaces.Discrete(3), [np.array([0, 1]), np.array([2])], [[1]], n_items=4)
+    assert batch.dtype == spaces.Discrete(3).dtype
+    np.testing.assert_array_equal(batch, [0, 1, 2, 1])
@@ -0,0 +1,152 @@
+""" VectorEnv with the dynamics of CartPole, where all the envs are stepped at once
+using numpy operations, rather than stepping a `CartPoleEnv` for each env.
+"""
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from gym.envs.classic_control import CartPoleEnv
+from gym.utils import seeding
+from gym.vector import VectorEnv
+
+from .worker import FINAL_STATE_KEY
+
+
+class CartPoleVectorEnv(VectorEnv):
+    """ Batch of `num_envs` CartPole envs, stepped together with numpy operations.
+
+    Like the other VectorEnvs, the envs that are done are reset in `step`, and their
+    final observation is saved in their `info` dict at the FINAL_STATE_KEY key.
+
+    NOTE: This only supports the default CartPole, i.e. the same constants (length,
+    gravity, etc.) are used for all the envs, which can be changed after creation by
+    setting the attributes of the same name on this env.
+    """
+
+    def __init__(self, num_envs: int, max_episode_steps: Optional[int] = 200):
+        env = CartPoleEnv()
+        super().__init__(
+            num_envs=num_envs,
+            observation_space=env.observation_space,
+            action_space=env.action_space,
+        )
+        self.gravity = env.gravity
+        self.masscart = env.masscart
+        self.masspole = env.masspole
+        self.length = env.length
+        self.force_mag = env.force_mag
+        self.tau = env.tau
+        self.kinematics_integrator = env.kinematics_integrator
+        self.theta_threshold_radians = env.theta_threshold_radians
+        self.x_threshold = env.x_threshold
+        env.close()
+
+        self.max_episode_steps = max_episode_steps
+        # One random number generator per env, used to sample its initial states.
+        self.np_randoms: List[np.random.RandomState] = []
+        self.seed()
+        # State of each env, with columns (x, x_dot, theta, theta_dot).
+        self.state = np.zeros([num_envs, 4])
+        self.elapsed_steps = np.zeros(num_envs, dtype=np.int64)
+        self._actions: Optional[np.ndarray] = None
+
+    @property
+    def total_mass(self) -> float:
+        return self.masspole + self.masscart
+
+    @property
+    def polemass_length(self) -> float:
+        return self.masspole * self.length
+
+    def seed(self, seeds: Union[int, Sequence[Optional[int]]] = None) -> List[int]:
+        if seeds is None:
+            seeds = [None for _ in range(self.num_envs)]
+        if isinstance(seeds, int):
+            seeds = [seeds + i for i in range(self.num_envs)]
+        if len(seeds) != self.num_envs:
+            raise ValueError(
+                f"Expected {self.num_envs} seeds (one per env), got {len(seeds)}."
+            )
+        self.np_randoms = []
+        used_seeds: List[int] = []
+        for seed in seeds:
+            np_random, used_seed = seeding.np_random(seed)
+            self.np_randoms.append(np_random)
+            used_seeds.append(used_seed)
+        return used_seeds
+
+    def _initial_states(self, indices: Sequence[int]) -> np.ndarray:
+        """ Samples an initial state for each env in `indices`, like `CartPoleEnv.reset`.
+        """
+        return np.stack([
+            self.np_randoms[i].uniform(low=-0.05, high=0.05, size=(4,)) for i in indices
+        ])
+
+    def reset_async(self) -> None:
+        pass
+
+    def reset_wait(self, **kwargs) -> np.ndarray:
+        self.state = self._initial_states(range(self.num_envs))
+        self.elapsed_steps[:] = 0
+        return self.state.astype(np.float32)
+
+    def step_async(self, actions: Sequence[int]) -> None:
+        actions = np.asarray(actions)
+        if actions.shape != (self.num_envs,) or not np.isin(actions, (0, 1)).all():
+            raise ValueError(
+                f"Expected one action in {{0, 1}} for each of the {self.num_envs} envs, "
+                f"got {actions!r}."
+            )
+        self._actions = actions
+
+    def step_wait(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[dict]]:
+        assert self._actions is not None, "Need to call `step_async` first."
+        x, x_dot, theta, theta_dot = self.state.T
+        force = np.where(self._actions == 1, self.force_mag, -self.force_mag)
+        costheta = np.cos(theta)
+        sintheta = np.sin(theta)
+
+        # Same equations as in `CartPoleEnv.step`, but for all the envs at once.
+        temp = (force + self.polemass_length * theta_dot ** 2 * sintheta) / self.total_mass
+        thetaacc = (self.gravity * sintheta - costheta * temp) / (
+            self.length * (4.0 / 3.0 - self.masspole * costheta ** 2 / self.total_mass)
+        )
+        xacc = temp - self.polemass_length * thetaacc * costheta / self.total_mass
+
+        if self.kinematics_integrator == "euler":
+            x = x + self.tau * x_dot
+            x_dot = x_dot + self.tau * xacc
+            theta = theta + self.tau * theta_dot
+            theta_dot = theta_dot + self.tau * thetaacc
+        else:  # semi-implicit euler
+            x_dot = x_dot + self.tau * xacc
+            x = x + self.tau * x_dot
+            theta_dot = theta_dot + self.tau * thetaacc
+            theta = theta + self.tau * theta_dot
+        self.state = np.stack([x, x_dot, theta, theta_dot], axis=1)
+        self._actions = None
+
+        failed = (
+            (x < -self.x_threshold)
+            | (x > self.x_threshold)
+            | (theta < -self.theta_threshold_radians)
+            | (theta > self.theta_threshold_radians)
+        )
+        self.elapsed_steps += 1
+        truncated = np.zeros_like(failed)
+        if self.max_episode_steps is not None:
+            truncated = ~failed & (self.elapsed_steps >= self.max_episode_steps)
+        dones = failed | truncated
+
+        observations = self.state.astype(np.float32)
+        rewards = np.ones(self.num_envs)
+        infos: List[dict] = [{} for _ in range(self.num_envs)]
+        if dones.any():
+            for index in np.flatnonzero(dones):
+                infos[index][FINAL_STATE_KEY] = observations[index].copy()
+                if truncated[index]:
+                    infos[index]["TimeLimit.truncated"] = True
+            # Reset the envs that are done.
+            self.state[dones] = self._initial_states(np.flatnonzero(dones))
+            self.elapsed_steps[dones] = 0
+            observations[dones] = self.state[dones]
+        return observations, rewards, dones, infos
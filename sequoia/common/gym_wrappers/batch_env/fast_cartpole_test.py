@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from gym.envs.classic_control import CartPoleEnv
+
+from .fast_cartpole import CartPoleVectorEnv
+from .worker import FINAL_STATE_KEY
+
+
+@pytest.mark.parametrize("batch_size", [1, 5])
+def test_same_dynamics_as_cartpole(batch_size: int):
+    env = CartPoleVectorEnv(num_envs=batch_size)
+    seeds = env.seed(123)
+    assert seeds == [123 + i for i in range(batch_size)]
+    obs = env.reset()
+    assert obs.shape == (batch_size, 4)
+    assert obs in env.observation_space
+
+    single_envs = [CartPoleEnv() for _ in range(batch_size)]
+    for i, (seed, single_env) in enumerate(zip(seeds, single_envs)):
+        # Seeding each env gives the same initial state as seeding a CartPoleEnv.
+        single_env.seed(seed)
+        np.testing.assert_allclose(single_env.reset(), obs[i], rtol=1e-5)
+        single_env.state = env.state[i].copy()
+
+    for step in range(5):
+        actions = env.action_space.sample()
+        obs, rewards, dones, infos = env.step(actions)
+        for i, single_env in enumerate(single_envs):
+            single_obs, single_reward, single_done, _ = single_env.step(int(actions[i]))
+            assert not dones[i] and not single_done
+            np.testing.assert_allclose(obs[i], single_obs, rtol=1e-5)
+            assert rewards[i] == single_reward
+
+
+def test_resets_envs_that_are_done():
+    env = CartPoleVectorEnv(num_envs=2, max_episode_steps=3)
+    env.seed(123)
+    env.reset()
+    # Make the first env fail on the next step.
+    env.state[0, 0] = env.x_threshold + 1
+    obs, rewards, dones, infos = env.step(np.array([0, 0]))
+    assert dones.tolist() == [True, False]
+    assert infos[0][FINAL_STATE_KEY][0] > env.x_threshold
+    # The first env was reset.
+    assert abs(obs[0][0]) <= 0.05
+
+    # The episodes are truncated after `max_episode_steps`.
+    for _ in range(2):
+        obs, rewards, dones, infos = env.step(np.array([0, 0]))
+    assert dones[1]
+    assert infos[1]["TimeLimit.truncated"]
+
+
+def test_seed_one_seed_per_env():
+    env = CartPoleVectorEnv(num_envs=3)
+    assert env.seed([1, 2, 3]) == [1, 2, 3]
+    with pytest.raises(ValueError):
+        env.seed([1, 2])
+
+
+def test_step_checks_actions():
+    env = CartPoleVectorEnv(num_envs=3)
+    env.reset()
+    with pytest.raises(ValueError):
+        env.step(np.array([0, 1]))
+    with pytest.raises(ValueError):
+        env.step(np.array([0, 1, 2]))
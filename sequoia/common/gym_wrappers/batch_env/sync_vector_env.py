@@ -25,6 +25,10 @@ class SyncVectorEnv(SyncVectorEnv_):
      
     def step_wait(self):
         observations, infos = [], []
+        # When the batched observations are a single array, write each observation
+        # directly into its slot, rather than collecting them in a list and then
+        # stacking them.
+        write_in_place = isinstance(self.observations, np.ndarray)
         for i, (env, action) in enumerate(zip(self.envs, self._actions)):
             observation, self._rewards[i], self._dones[i], info = env.step(action)
             # Don't manually reset VectorEnvs, since they reset the right env
@@ -35,12 +39,18 @@ class SyncVectorEnv(SyncVectorEnv_):
                 if FINAL_STATE_KEY not in info:
                     info[FINAL_STATE_KEY] = observation
                 observation = env.reset()
-            observations.append(observation)
+            if write_in_place:
+                self.observations[i] = observation
+            else:
+                observations.append(observation)
             infos.append(info)
-        concatenate(observations, self.observations, self.single_observation_space)
+        if write_in_place:
+            observations = np.copy(self.observations) if self.copy else self.observations
+        else:
+            concatenate(observations, self.observations, self.single_observation_space)
+            observations = deepcopy(self.observations) if self.copy else self.observations
 
-        return (deepcopy(self.observations) if self.copy else self.observations,
-            np.copy(self._rewards), np.copy(self._dones), infos)
+        return (observations, np.copy(self._rewards), np.copy(self._dones), infos)
 
 
     def render(self, mode: str = "rgb_array"):        
@@ -0,0 +1,47 @@
+from functools import partial
+
+import gym
+import numpy as np
+import pytest
+
+from .sync_vector_env import SyncVectorEnv
+from .worker import FINAL_STATE_KEY
+
+
+@pytest.mark.parametrize("copy", [True, False])
+def test_step_writes_observations_in_place(copy: bool):
+    """ The observations are written directly into the batch in `step_wait`, and are
+    the same as when stepping each env separately.
+    """
+    batch_size = 3
+    env = SyncVectorEnv([partial(gym.make, "CartPole-v0") for _ in range(batch_size)], copy=copy)
+    single_envs = [gym.make("CartPole-v0") for _ in range(batch_size)]
+    env.seed(123)
+    for i, single_env in enumerate(single_envs):
+        single_env.seed(123 + i)
+
+    obs = env.reset()
+    np.testing.assert_allclose(
+        obs, [single_env.reset() for single_env in single_envs], rtol=1e-5
+    )
+
+    previous_obs = None
+    for step in range(50):
+        actions = np.zeros(batch_size, dtype=int)
+        obs, rewards, dones, infos = env.step(actions)
+        assert obs.shape == (batch_size, 4)
+        assert obs.dtype == env.observation_space.dtype
+        # The returned observations are a copy of the batch only when `copy` is True.
+        assert (obs is env.observations) != copy
+        if copy and previous_obs is not None:
+            assert not np.shares_memory(obs, previous_obs)
+        previous_obs = obs
+
+        for i, single_env in enumerate(single_envs):
+            single_obs, _, single_done, _ = single_env.step(0)
+            assert dones[i] == single_done
+            if single_done:
+                np.testing.assert_allclose(infos[i][FINAL_STATE_KEY], single_obs, rtol=1e-5)
+                single_obs = single_env.reset()
+            np.testing.assert_allclose(obs[i], single_obs, rtol=1e-5)
+    env.close()
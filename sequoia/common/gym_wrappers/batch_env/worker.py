@@ -1,10 +1,14 @@
 """Customized version of the worker_ function from gym.vector.async_vector_env.
 """
 import multiprocessing as mp
+import struct
 import sys
 from multiprocessing.connection import Connection, wait
-from typing import Any, List, Union
+from multiprocessing.reduction import ForkingPickler
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
 import traceback
+from operator import attrgetter, itemgetter
+from types import BuiltinFunctionType, FunctionType
 
 import gym
 import numpy as np
@@ -13,6 +17,14 @@ from gym.vector.async_vector_env import write_to_shared_memory
 from gym.vector.async_vector_env import _worker, _worker_shared_memory
 from gym.vector.utils import CloudpickleWrapper
 
+from sequoia.utils.utils import LFUCache
+
+try:
+    from multiprocessing.shared_memory import SharedMemory
+except ImportError:
+    # NOTE: `multiprocessing.shared_memory` is only available in python >= 3.8.
+    SharedMemory = None
+
 # TODO: Find a way to turn off the logs coming from the workers. 
 # from sequoia.utils.logging_utils import get_logger
 
@@ -29,6 +41,12 @@ class Commands:
 
     # WIP:
     apply = "apply"
+    # Registers a function on the worker, so that it can later be applied by
+    # sending only its integer id (see `AsyncVectorEnv.register_function`).
+    register = "register"
+    apply_registered = "apply_registered"
+    # Applies a list of (`apply` or `apply_registered`) commands at once.
+    apply_batch = "apply_batch"
 
     # Things to re-add:
     get_attr = "getattr"
@@ -42,6 +60,170 @@ from gym import Env
 from typing import Callable
 from multiprocessing.queues import Queue
 
+# Opcodes of the 'framed' messages used for the apply commands. These are sent with
+# `Connection.send_bytes`, as a fixed-size header (opcode, value) optionally followed
+# by a pickled payload, rather than as a pickled (command, data) tuple.
+# NOTE: Pickled messages always start with the PROTO opcode (0x80), so they can't be
+# confused with the framed messages.
+OP_APPLY_ID = 1
+OP_APPLY_PICKLE = 2
+OP_APPLY_BATCH = 3
+_HEADER = struct.Struct(">BI")
+
+# Maximum number of unpickled functions kept by each worker (see `decode_command`).
+FUNCTION_CACHE_SIZE = 1024
+# Pickled functions larger than this are not cached, since they most likely carry
+# data (e.g. arrays) rather than being a small callable like `attrgetter(name)`.
+MAX_CACHED_FUNCTION_NBYTES = 4096
+
+
+def encode_apply_command(command: str, data: Any) -> bytes:
+    """ Encodes an `apply`, `apply_registered` or `apply_batch` command into a
+    framed message, to be sent to a worker with `Connection.send_bytes`.
+
+    Registered functions without arguments are sent as just the 5-byte header.
+    """
+    if command == Commands.apply_registered:
+        function_id, args, kwargs = data
+        header = _HEADER.pack(OP_APPLY_ID, function_id)
+        if not args and not kwargs:
+            return header
+        return header + ForkingPickler.dumps((args, kwargs))
+    if command == Commands.apply:
+        return _HEADER.pack(OP_APPLY_PICKLE, 0) + ForkingPickler.dumps(data)
+    if command == Commands.apply_batch:
+        return _HEADER.pack(OP_APPLY_BATCH, len(data)) + ForkingPickler.dumps(data)
+    raise RuntimeError(f"Command {command} can't be sent as a framed message.")
+
+
+def decode_command(
+    message: bytes, function_cache: Optional[LFUCache[bytes, Callable]] = None
+) -> Tuple[str, Any]:
+    """ Decodes a message received by a worker into a (command, data) tuple.
+
+    The message is either a framed message (see `encode_apply_command`) or a
+    pickled (command, data) tuple, as sent by `Connection.send`.
+
+    When `function_cache` is passed, the stateless functions of `apply` commands
+    (see `_is_stateless`) are cached in it, using the message bytes as the key, so
+    that sending the same function again doesn't unpickle it again. Functions that
+    carry arguments (e.g. `methodcaller` or `partial` objects) are unpickled again
+    for each call, so that calls never share (possibly mutated) argument objects.
+    """
+    opcode = message[0]
+    if opcode not in {OP_APPLY_ID, OP_APPLY_PICKLE, OP_APPLY_BATCH}:
+        return ForkingPickler.loads(message)
+    _, value = _HEADER.unpack_from(message)
+    payload = memoryview(message)[_HEADER.size:]
+    if opcode == OP_APPLY_ID:
+        args, kwargs = ForkingPickler.loads(payload) if payload else ((), {})
+        return Commands.apply_registered, (value, args, kwargs)
+    if opcode == OP_APPLY_PICKLE:
+        if function_cache is None or len(payload) > MAX_CACHED_FUNCTION_NBYTES:
+            return Commands.apply, ForkingPickler.loads(payload)
+        function = function_cache.get(message)
+        if function is None:
+            function = ForkingPickler.loads(payload)
+            if _is_stateless(function):
+                function_cache[message] = function
+        return Commands.apply, function
+    return Commands.apply_batch, ForkingPickler.loads(payload)
+
+
+def _is_stateless(function: Callable) -> bool:
+    """ Returns wether `function` can safely be reused across calls, i.e. if it
+    doesn't carry any argument objects of its own.
+    """
+    if isinstance(function, (attrgetter, itemgetter)):
+        return True
+    if isinstance(function, BuiltinFunctionType):
+        return True
+    return isinstance(function, FunctionType) and function.__closure__ is None
+
+
+# Size of the shared memory buffer used by each worker to send back large results.
+RESULT_BUFFER_SIZE = 4 * 1024 ** 2
+# Results smaller than this are sent through the pipe, since doing so is cheap.
+MIN_SHARED_RESULT_NBYTES = 64 * 1024
+
+
+class SharedArrayResult(NamedTuple):
+    """ Sent by a worker in place of an array result that was written to its
+    shared memory buffer.
+    """
+    buffer_name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+class SharedPickledResult(NamedTuple):
+    """ Sent by a worker in place of a (result, success) tuple whose pickled bytes
+    were written to its shared memory buffer.
+    """
+    buffer_name: str
+    nbytes: int
+
+
+def send_result(
+    pipe: Connection, result: Any, buffer: Optional["SharedMemory"]
+) -> Optional["SharedMemory"]:
+    """ Sends the `result` of a command back to the parent, and returns the shared
+    memory buffer of the worker (which is created when first needed).
+
+    Large numpy arrays are written directly to the shared memory `buffer`, and a
+    `SharedArrayResult` is sent through the pipe instead. Other results are
+    pickled once, and when large enough, the pickled bytes are also written to the
+    buffer, with only a small `SharedPickledResult` going through the pipe.
+    """
+    if SharedMemory is None:
+        pipe.send((result, True))
+        return buffer
+    # NOTE: Only plain arrays go through the shared memory as raw bytes: subclasses
+    # (e.g. recarrays) and structured dtypes (whose `dtype.str` is just '|V<n>') go
+    # through the pickled path below, which preserves them.
+    if (
+        type(result) is np.ndarray
+        and not result.dtype.hasobject
+        and result.dtype.fields is None
+    ):
+        if not MIN_SHARED_RESULT_NBYTES <= result.nbytes <= RESULT_BUFFER_SIZE:
+            pipe.send((result, True))
+            return buffer
+        if buffer is None:
+            buffer = SharedMemory(create=True, size=RESULT_BUFFER_SIZE)
+        np.ndarray(result.shape, dtype=result.dtype, buffer=buffer.buf)[...] = result
+        pipe.send((SharedArrayResult(buffer.name, result.shape, result.dtype.str), True))
+        return buffer
+
+    message = ForkingPickler.dumps((result, True))
+    nbytes = len(message)
+    if not MIN_SHARED_RESULT_NBYTES <= nbytes <= RESULT_BUFFER_SIZE:
+        # NOTE: `send_bytes` of the pickled tuple is the same as `send` of the tuple.
+        pipe.send_bytes(message)
+        return buffer
+    if buffer is None:
+        buffer = SharedMemory(create=True, size=RESULT_BUFFER_SIZE)
+    buffer.buf[:nbytes] = message
+    pipe.send((SharedPickledResult(buffer.name, nbytes), True))
+    return buffer
+
+
+def _close_result_buffer(buffer: Optional["SharedMemory"]) -> None:
+    if buffer is not None:
+        buffer.close()
+        buffer.unlink()
+
+
+def _apply(env: Env, registry: Dict[int, Callable], command: str, data: Any) -> Any:
+    """ Applies the function from an `apply` or `apply_registered` command to `env`.
+    """
+    if command == Commands.apply_registered:
+        function_id, args, kwargs = data
+        return registry[function_id](*args, env, **kwargs)
+    assert command == Commands.apply and callable(data)
+    return data(env)
+
+
 def _custom_worker_shared_memory(index: int,
                                  env_fn: Callable[[], Env],
                                  pipe: Connection,
@@ -68,6 +250,12 @@ def _custom_worker_shared_memory(index: int,
     env = env_fn()
     observation_space = env.observation_space
     parent_pipe.close()
+    # Functions registered by the parent, indexed by their id.
+    registry: Dict[int, Callable] = {}
+    # Functions from previous `apply` commands, indexed by their pickled bytes.
+    function_cache: LFUCache[bytes, Callable] = LFUCache(maxsize=FUNCTION_CACHE_SIZE)
+    # Shared memory buffer used to send back large array results, if needed.
+    result_buffer: Optional[SharedMemory] = None
 
     def step_fn(actions):
         observation, reward, done, info = env.step(actions)
@@ -87,7 +275,7 @@ def _custom_worker_shared_memory(index: int,
 
     try:
         while True:
-            command, data = pipe.recv()
+            command, data = decode_command(pipe.recv_bytes(), function_cache)
             # print(f"Worker {index} received command {command}")
             if command == Commands.reset:
                 observation = env.reset()
@@ -109,11 +297,20 @@ def _custom_worker_shared_memory(index: int,
                 pipe.send((data == observation_space, True))
 
             # Below this: added commands.
-            elif command == Commands.apply:
-                assert callable(data)
-                function = data
-                results = function(env)
-                pipe.send((results, True))
+            elif command in {Commands.apply, Commands.apply_registered}:
+                results = _apply(env, registry, command, data)
+                result_buffer = send_result(pipe, results, result_buffer)
+            elif command == Commands.apply_batch:
+                results = [
+                    _apply(env, registry, apply_command, apply_data)
+                    for apply_command, apply_data in data
+                ]
+                result_buffer = send_result(pipe, results, result_buffer)
+            elif command == Commands.register:
+                function_id, function = data
+                assert callable(function)
+                registry[function_id] = function
+                pipe.send((function_id, True))
 
             elif command == Commands.render:
                 pipe.send(env.render(mode="rgb_array"))
@@ -127,12 +324,19 @@ def _custom_worker_shared_memory(index: int,
         pipe.send((None, False))
     finally:
         env.close()
+        _close_result_buffer(result_buffer)
 
 
 def _custom_worker(index, env_fn, pipe, parent_pipe, shared_memory, error_queue):
     assert shared_memory is None
     env = env_fn()
     parent_pipe.close()
+    # Functions registered by the parent, indexed by their id.
+    registry: Dict[int, Callable] = {}
+    # Functions from previous `apply` commands, indexed by their pickled bytes.
+    function_cache: LFUCache[bytes, Callable] = LFUCache(maxsize=FUNCTION_CACHE_SIZE)
+    # Shared memory buffer used to send back large array results, if needed.
+    result_buffer: Optional[SharedMemory] = None
 
     def step_fn(actions):
         observation, reward, done, info = env.step(actions)
@@ -152,7 +356,7 @@ def _custom_worker(index, env_fn, pipe, parent_pipe, shared_memory, error_queue)
 
     try:
         while True:
-            command, data = pipe.recv()
+            command, data = decode_command(pipe.recv_bytes(), function_cache)
             if command == 'reset':
                 observation = env.reset()
                 pipe.send((observation, True))
@@ -169,12 +373,20 @@ def _custom_worker(index, env_fn, pipe, parent_pipe, shared_memory, error_queue)
                 pipe.send((data == env.observation_space, True))
             
             # Below this: added commands.
-            elif command == Commands.apply:
-                assert callable(data)
-                function = data
-                results = function(env)
-                
-                pipe.send((results, True))
+            elif command in {Commands.apply, Commands.apply_registered}:
+                results = _apply(env, registry, command, data)
+                result_buffer = send_result(pipe, results, result_buffer)
+            elif command == Commands.apply_batch:
+                results = [
+                    _apply(env, registry, apply_command, apply_data)
+                    for apply_command, apply_data in data
+                ]
+                result_buffer = send_result(pipe, results, result_buffer)
+            elif command == Commands.register:
+                function_id, function = data
+                assert callable(function)
+                registry[function_id] = function
+                pipe.send((function_id, True))
             elif command == Commands.render:
                 pipe.send(env.render(mode="rgb_array"))
 
@@ -191,6 +403,7 @@ def _custom_worker(index, env_fn, pipe, parent_pipe, shared_memory, error_queue)
         pipe.send((None, False))
     finally:
         env.close()
+        _close_result_buffer(result_buffer)
 
 
 def set_attr_on_env(env: Union[gym.Env, gym.Wrapper], attr: str, value: Any) -> Union[gym.Env, gym.Wrapper]:
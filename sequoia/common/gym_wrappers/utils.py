@@ -323,11 +323,19 @@ class IterableWrapper(MayCloseEarly, IterableDataset, Generic[EnvType], ABC):
         super().__init__(env)
         from sequoia.settings.sl import PassiveEnvironment
         self.wrapping_passive_env = isinstance(self.unwrapped, PassiveEnvironment)
+        # NOTE: The unwrapped env doesn't change, so we only check this once, rather
+        # than going through the whole chain of wrappers at each step.
+        self._is_vectorized = isinstance(self.unwrapped, VectorEnv)
 
     @property
     def is_vectorized(self) -> bool:
         """ Returns wether this wrapper is wrapping a vectorized environment. """
-        return isinstance(self.unwrapped, VectorEnv)
+        is_vectorized = getattr(self, "_is_vectorized", None)
+        if is_vectorized is None:
+            # NOTE: Subclasses might not call `IterableWrapper.__init__`, or might use
+            # this before calling it.
+            return isinstance(self.unwrapped, VectorEnv)
+        return is_vectorized
 
     def __next__(self):
         # TODO: This is tricky. We want the wrapped env to use *our* step,
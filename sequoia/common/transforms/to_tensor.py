@@ -92,11 +92,13 @@ def _(image: Union[Image, np.ndarray]) -> Tensor:
         # Convert to channels last if needed, because ToTensor expects to
         # receive that.
         image = channels_first_if_needed(image)
-        image = torch.from_numpy(image).contiguous()
+        image = torch.from_numpy(image)
         # backward compatibility
         if isinstance(image, torch.ByteTensor):
-            image = image.float().div(255)
-        return image
+            # NOTE: Convert to float and make contiguous in a single copy, and
+            # then scale in-place, rather than creating three new tensors.
+            return image.to(dtype=torch.float32, memory_format=torch.contiguous_format).div_(255)
+        return image.contiguous()
 
 
     if len(image.shape) == 4:
@@ -1,5 +1,7 @@
 """Runs an experiment, which consist in applying a Method to a Setting.
 """
+import logging
+
 import sequoia.methods
 from sequoia.methods import get_all_methods
 from sequoia.settings import all_settings
@@ -9,12 +11,15 @@ from sequoia.experiments import Experiment
 logger = get_logger(__file__)
 
 def main():
-    logger.debug("Registered Settings: \n" + "\n".join(
-        f"- {setting.get_name()}: {setting} ({setting.get_path_to_source_file()})" for setting in all_settings
-    ))
-    logger.debug("Registered Methods: \n" + "\n".join(
-        f"- {method.get_full_name()}: {method} ({method.get_path_to_source_file()})" for method in get_all_methods()
-    ))
+    # NOTE: Only build these messages when they will actually be logged, since
+    # getting the source files of all the settings and methods is slow.
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Registered Settings: \n" + "\n".join(
+            f"- {setting.get_name()}: {setting} ({setting.get_path_to_source_file()})" for setting in all_settings
+        ))
+        logger.debug("Registered Methods: \n" + "\n".join(
+            f"- {method.get_full_name()}: {method} ({method.get_path_to_source_file()})" for method in get_all_methods()
+        ))
 
     return Experiment.main()
 
@@ -18,6 +18,8 @@ class AuxiliaryTask(nn.Module):
     """ Represents an additional loss to apply to a `Classifier`.
 
     The main logic should be implemented in the `get_loss` method.
+    NOTE: The model doesn't call `get_loss` on tasks which are disabled or have a
+    coefficient of 0.
 
     In general, it should apply some deterministic transformation to its input,
     and treat that same transformation as a label to predict.
@@ -48,6 +48,13 @@ class TransformationBasedTask(AuxiliaryTask):
         # Wether or not both the original and transformed codes should be passed
         # to the auxiliary layer in order to detect the transformation. 
         compare_with_original: bool = True
+        # Wether to encode all the transformed inputs in a single forward pass of the
+        # encoder, rather than one forward pass per transformation argument.
+        # NOTE: This changes the training behaviour of encoders with BatchNorm
+        # layers: in train mode, the batch statistics are computed over the inputs
+        # of all the transformations together, and the running statistics only get
+        # one update per step, rather than one per transformation argument.
+        fuse_encoder_passes: bool = False
 
     def __init__(self,
                  function: Callable[[Tensor, Any], Tensor],
@@ -101,9 +108,18 @@ class TransformationBasedTask(AuxiliaryTask):
         assert self.alphas is not None, "set the `self.alphas` attribute in the base class."
         assert self.function_args is not None, "set the `self.function_args` attribute in the base class."
 
+        # TODO: Transform before or after the `preprocess_inputs` function?
+        x = fix_channels(x)
+        # Transform x using the function with each argument, and get the codes for
+        # all the transformed inputs at once.
+        x_ts = [self.function(x, fn_arg) for fn_arg in self.function_args]
+        h_x_ts = self.encode_all(x_ts)
+
         # Get the loss for each transformation argument.
-        for fn_arg, alpha in zip(self.function_args, self.alphas):
-            loss_i = self.get_loss_for_arg(x=x, h_x=h_x, fn_arg=fn_arg, alpha=alpha)
+        for fn_arg, alpha, x_t, h_x_t in zip(self.function_args, self.alphas, x_ts, h_x_ts):
+            loss_i = self.get_loss_for_arg(
+                x_t=x_t, h_x=h_x, h_x_t=h_x_t, fn_arg=fn_arg, alpha=alpha
+            )
             loss_info += loss_i
             # print(f"{self.name}_{fn_arg}", loss_i.metrics)
 
@@ -116,14 +132,23 @@ class TransformationBasedTask(AuxiliaryTask):
         metrics[self.name] = total_metrics
         return loss_info
 
-    def get_loss_for_arg(self, x: Tensor, h_x: Tensor, fn_arg: Any, alpha: Tensor) -> Loss:
-        alpha = alpha.to(x.device)
-        # TODO: Transform before or after the `preprocess_inputs` function?
-        x = fix_channels(x)
-        # Transform X using the function.
-        x_t = self.function(x, fn_arg)
-        # Get the code for the transformed x.
-        h_x_t = self.encode(x_t)
+    def encode_all(self, xs: List[Tensor]) -> List[Tensor]:
+        """ Encodes each input in `xs`.
+
+        When `fuse_encoder_passes` is set in the options and the inputs all have the
+        same shape, they are encoded in a single forward pass of the encoder, rather
+        than one forward pass per input.
+        """
+        if (
+            self.options.fuse_encoder_passes
+            and len(xs) > 1
+            and all(x_i.shape == xs[0].shape for x_i in xs)
+        ):
+            return list(self.encode(torch.cat(xs)).split(xs[0].shape[0]))
+        return [self.encode(x_i) for x_i in xs]
+
+    def get_loss_for_arg(self, x_t: Tensor, h_x: Tensor, h_x_t: Tensor, fn_arg: Any, alpha: Tensor) -> Loss:
+        alpha = alpha.to(x_t.device)
 
         aux_layer_input = h_x_t
         if self.options.compare_with_original:
@@ -0,0 +1,46 @@
+import pytest
+import torch
+from torch import nn
+
+from ..auxiliary_task import AuxiliaryTask
+from .rotation import RotationTask
+
+hidden_size = 16
+
+
+def make_encoder(batch_norm: bool) -> nn.Module:
+    return nn.Sequential(
+        nn.Conv2d(1, 4, kernel_size=3),
+        nn.BatchNorm2d(4) if batch_norm else nn.Identity(),
+        nn.ReLU(),
+        nn.Flatten(),
+        nn.Linear(4 * 6 * 6, hidden_size),
+    )
+
+
+@pytest.mark.parametrize("batch_norm", [False, True])
+def test_fused_encoder_passes_loss(monkeypatch, batch_norm: bool):
+    """ Compares the loss of the fused and per-argument encoder passes, with the
+    encoder in train mode.
+
+    The losses are the same without BatchNorm, but differ with BatchNorm, since the
+    batch statistics are then computed over the inputs of all the rotations at once.
+    """
+    torch.manual_seed(123)
+    encoder = make_encoder(batch_norm=batch_norm).train()
+    monkeypatch.setattr(AuxiliaryTask, "encoder", encoder, raising=False)
+    monkeypatch.setattr(AuxiliaryTask, "hidden_size", hidden_size)
+
+    task = RotationTask(options=RotationTask.Options(compare_with_original=False))
+    x = torch.rand(5, 1, 8, 8)
+    h_x = encoder(x)
+
+    assert not task.options.fuse_encoder_passes
+    per_arg_loss = task.get_loss(x=x, h_x=h_x).loss
+    task.options.fuse_encoder_passes = True
+    fused_loss = task.get_loss(x=x, h_x=h_x).loss
+
+    if batch_norm:
+        assert not torch.allclose(fused_loss, per_arg_loss)
+    else:
+        assert torch.allclose(fused_loss, per_arg_loss)
@@ -9,8 +9,10 @@ TODO: Add a wrapper to limit the 'epoch' length in RL, and then use an early-sto
 callback to also perform validation like in SL.
 """
 import json
+import multiprocessing as mp
 import operator
 import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass, is_dataclass, fields
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Type, Union
@@ -35,6 +37,7 @@ from sequoia.settings.base.objects import Actions, Observations, Rewards
 from sequoia.settings.base.results import Results
 from sequoia.settings.base.setting import Setting, SettingType
 from sequoia.utils import Parseable, Serializable, compute_identity, get_logger
+from sequoia.utils.generic_functions import as_torch_view
 from sequoia.methods import register_method
 from sequoia.settings.sl.continual import ContinualSLSetting
 
@@ -43,6 +46,9 @@ from .trainer import Trainer, TrainerConfig
 
 logger = get_logger(__file__)
 
+# NOTE: `torch.inference_mode` was added in torch 1.9, so fall back to `no_grad` before.
+_inference_mode = getattr(torch, "inference_mode", torch.no_grad)
+
 from sequoia.common.gym_wrappers.utils import IterableWrapper, has_wrapper
 from sequoia.settings.rl.continual.environment import GymDataLoader
 
@@ -165,7 +171,7 @@ class BaseMethod(Method, Serializable, Parseable, target_setting=Setting):
 
         self.additional_train_wrappers: List[Callable] = []
         self.additional_valid_wrappers: List[Callable] = []
-        
+
         self.setting: Setting
 
     def configure(self, setting: SettingType) -> None:
@@ -325,13 +331,32 @@ class BaseMethod(Method, Serializable, Parseable, target_setting=Setting):
         always be `True`.
         """
         self.model.eval()
-        with torch.no_grad():
+        if self.model.device.type == "cuda":
+            observations = observations._map(self._to_device_non_blocking, recursive=True)
+        else:
+            observations = observations._map(as_torch_view, recursive=True)
+        # Use mixed-precision for the forward pass when training with 16-bit precision.
+        use_amp = self.trainer_options.precision == 16 and self.model.device.type == "cuda"
+        with _inference_mode(), torch.cuda.amp.autocast(enabled=use_amp):
             forward_pass = self.model.forward(observations)
         actions: Actions = forward_pass.actions
         action_numpy = actions.actions_np
         assert action_numpy in action_space, (action_numpy, action_space)
         return actions
 
+    def _to_device_non_blocking(self, value: Any) -> Any:
+        """ Copies a tensor or numerical array from the CPU to the model's device,
+        through pinned memory, so that the copy doesn't block.
+
+        Other values are returned unchanged.
+        """
+        value = as_torch_view(value)
+        if not isinstance(value, torch.Tensor) or value.device.type != "cpu":
+            return value
+        # NOTE: The pinned memory comes from pytorch's caching host allocator, which
+        # only reuses it once the copy to the device is done.
+        return value.pin_memory().to(self.model.device, non_blocking=True)
+
     def create_model(self, setting: SettingType) -> BaseModel[SettingType]:
         """Creates the BaseModel (a LightningModule) for the given Setting.
 
@@ -512,26 +537,70 @@ class BaseMethod(Method, Serializable, Parseable, target_setting=Setting):
         ]
 
     def apply_all(
-        self, argv: Union[str, List[str]] = None
-    ) -> Dict[Type[Setting], Results]:
+        self, argv: Union[str, List[str]] = None, max_workers: int = 1
+    ) -> Dict[Type[Setting], Optional[Results]]:
         """(WIP): Runs this Method on all its applicable settings.
 
+        Parameters
+        ----------
+
+        argv : Union[str, List[str]], optional
+            Command-line arguments used to create the settings, by default None.
+
+        max_workers : int, optional
+            Number of settings to run in parallel, by default 1. When greater than
+            1, each setting is run in a separate ('spawn') process, where both the
+            method and the setting are created from `argv`.
+
         Returns
         -------
 
             Dict mapping from setting type to the Results produced by this method.
+            When running in parallel, the settings on which the method crashed are
+            mapped to `None`.
         """
         applicable_settings = self.get_applicable_settings()
 
-        all_results: Dict[Type[Setting], Results] = {}
-        for setting_type in applicable_settings:
-            setting = setting_type.from_args(argv)
-            results = setting.apply(self)
-            all_results[setting_type] = results
+        all_results: Dict[Type[Setting], Optional[Results]] = {}
+        if max_workers > 1:
+            with ProcessPoolExecutor(
+                max_workers=max_workers, mp_context=mp.get_context("spawn")
+            ) as executor:
+                futures = {
+                    executor.submit(_apply_on_setting, type(self), setting_type, argv): setting_type
+                    for setting_type in applicable_settings
+                }
+                for future in as_completed(futures):
+                    setting_type = futures[future]
+                    try:
+                        results = future.result()
+                    except Exception as exc:
+                        # Don't let one failed setting throw away the results of
+                        # the others: record it as crashed and keep going.
+                        logger.error(
+                            f"Applying the method on setting {setting_type.get_name()} "
+                            f"failed: {exc!r}"
+                        )
+                        results = None
+                    else:
+                        logger.info(
+                            f"Results on setting {setting_type.get_name()}: "
+                            f"{results.objective if results else 'crashed'}"
+                        )
+                    all_results[setting_type] = results
+            # Keep the same order as `applicable_settings`.
+            all_results = {
+                setting_type: all_results[setting_type] for setting_type in applicable_settings
+            }
+        else:
+            for setting_type in applicable_settings:
+                setting = setting_type.from_args(argv)
+                results = setting.apply(self)
+                all_results[setting_type] = results
         print(f"All results for method of type {type(self)}:")
         print(
             {
-                method.get_name(): (results.get_metric() if results else "crashed")
+                method.get_name(): (results.objective if results else "crashed")
                 for method, results in all_results.items()
             }
         )
@@ -590,3 +659,14 @@ class BaseMethod(Method, Serializable, Parseable, target_setting=Setting):
         # run.config["hparams"] = self.hparams.to_dict()
         # run.config["trainer_config"] = self.trainer_options
 
+
+def _apply_on_setting(
+    method_type: Type[BaseMethod], setting_type: Type[Setting], argv: Union[str, List[str]] = None
+) -> Results:
+    """ Creates a method and a setting from `argv` and applies the method on the
+    setting. Used to run the settings in separate processes in `apply_all`, so that
+    the (live) method doesn't need to be pickled.
+    """
+    method = method_type.from_args(argv)
+    setting = setting_type.from_args(argv)
+    return setting.apply(method)
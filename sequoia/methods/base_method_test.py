@@ -145,3 +145,30 @@ def test_weird_pl_bug():
     assert replica_device is not None
 
 BaseMethodTests = TestBaseMethod
+
+
+class _FakeResults:
+    objective: float = 1.0
+
+
+def _fake_apply_on_setting(method_type, setting_type, argv=None):
+    if setting_type is IncrementalRLSetting:
+        raise RuntimeError("Crashed on purpose.")
+    return _FakeResults()
+
+
+def test_apply_all_parallel_keeps_going_after_a_crash(monkeypatch):
+    """ When a setting crashes in `apply_all` with multiple workers, it is recorded
+    as crashed, and the results of the other settings are kept.
+    """
+    from . import base_method
+
+    settings = [ClassIncrementalSetting, IncrementalRLSetting, TraditionalRLSetting]
+    monkeypatch.setattr(BaseMethod, "get_applicable_settings", classmethod(lambda cls: settings))
+    monkeypatch.setattr(base_method, "_apply_on_setting", _fake_apply_on_setting)
+
+    all_results = BaseMethod.apply_all(BaseMethod(), max_workers=2)
+    assert list(all_results) == settings
+    assert all_results[IncrementalRLSetting] is None
+    assert all_results[ClassIncrementalSetting].objective == 1.0
+    assert all_results[TraditionalRLSetting].objective == 1.0
@@ -61,7 +61,9 @@ class SelfSupervisedModel(Model[SettingType]):
         # Add the self-supervised losses from all the enabled auxiliary tasks.
         for task_name, aux_task in self.tasks.items():
             assert task_name, "Auxiliary tasks should have a name!"
-            if aux_task.enabled:
+            # NOTE: `disabled` is also True when the coefficient is 0, in which case
+            # we skip computing the loss, since it wouldn't contribute anything.
+            if not aux_task.disabled:
                 # TODO: Auxiliary tasks all share the same 'y' for now, but it
                 # might make more sense to organize this differently.
                 y = rewards.y if rewards else None
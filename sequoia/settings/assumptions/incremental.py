@@ -11,7 +11,6 @@ from pathlib import Path
 from typing import ClassVar, Dict, List, Optional, Sequence, Tuple, Type, TypeVar, Union
 
 import gym
-import matplotlib.pyplot as plt
 import torch
 import tqdm
 import wandb
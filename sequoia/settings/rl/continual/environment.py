@@ -169,6 +169,20 @@ class GymDataLoader(
         # that pytorch-lightning stops warning us that the num_workers is too low.
         self._batch_size = batch_size
         self._num_workers = num_workers
+        # NOTE: The workers of the VectorEnv are already persistent: they are created
+        # once with the env, and reused for every epoch (iteration) over it. These
+        # DataLoader options only apply to pytorch workers, and raise an error when
+        # `num_workers=0`.
+        for dataloader_worker_option in ("persistent_workers", "prefetch_factor"):
+            if dataloader_worker_option in kwargs:
+                logger.warning(UserWarning(
+                    f"Ignoring the `{dataloader_worker_option}` argument, since the "
+                    f"env's workers are already kept alive across epochs."
+                ))
+                kwargs.pop(dataloader_worker_option)
+        # Wether we already checked that the observations contain the 'done' signal
+        # (see `__iter__`).
+        self._checked_done_signal = False
         super().__init__(
             dataset=self.env,
             # The batch size is None, because the VecEnv takes care of
@@ -182,6 +196,10 @@ class GymDataLoader(
         assert not isinstance(
             self.env, GymDataLoader
         ), "Something very wrong is happening."
+        # NOTE: The wrapped env doesn't change, so we check these once here rather
+        # than going through the chain of wrappers in each call to `send`.
+        self._is_vectorized = isinstance(self.env.unwrapped, VectorEnv)
+        self._tuple_action_space = isinstance(self.env.action_space, spaces.Tuple)
 
         # self.max_epochs: int = max_epochs
         self.observation_space: gym.Space = self.env.observation_space
@@ -256,7 +274,9 @@ class GymDataLoader(
         # TODO: Pretty sure this could be greatly simplified by just always using the loop from EnvDataset.
         # return super().__iter__()
         # assert False, self.env.__iter__()
-        if self.is_vectorized:
+        if self.is_vectorized and not self._checked_done_signal:
+            # NOTE: Only check (and warn) once, rather than each time we iterate.
+            self._checked_done_signal = True
             # elif isinstance(self.observation_space, spaces.Tuple)
             if not self._obs_have_done_signal():
                 warnings.warn(RuntimeWarning(colorize(
@@ -344,9 +364,13 @@ class GymDataLoader(
             action = action.detach().cpu().numpy()
         if isinstance(action, np.ndarray) and not action.shape:
             action = action.item()
-        if isinstance(self.env.action_space, spaces.Tuple) and isinstance(
-            action, np.ndarray
-        ):
+        if self._tuple_action_space and isinstance(action, np.ndarray):
+            if self._is_vectorized:
+                # NOTE: Check the actions against the batched action space, which
+                # checks all of them at once, rather than one at a time against each
+                # space of the Tuple.
+                assert action in self.action_space, (action, self.action_space)
+                return super().send(action.tolist())
             action = action.tolist()
         assert action in self.env.action_space, (action, self.env.action_space)
         return super().send(action)
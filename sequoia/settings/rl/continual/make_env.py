@@ -8,6 +8,7 @@ from typing import (Callable, Dict, Iterable, List, Optional, Tuple, Type,
 
 import gym
 from gym import Wrapper
+from gym.wrappers import TimeLimit
 from gym.envs.classic_control import CartPoleEnv
 from gym.vector import VectorEnv
 
@@ -15,6 +16,7 @@ from sequoia.common.gym_wrappers import ConvertToFromTensors
 from sequoia.common.gym_wrappers.batch_env import (AsyncVectorEnv,
                                                    BatchedVectorEnv,
                                                    SyncVectorEnv)
+from sequoia.common.gym_wrappers.batch_env.fast_cartpole import CartPoleVectorEnv
 from sequoia.common.spaces import Sparse
 from sequoia.utils.logging_utils import get_logger
 
@@ -30,6 +32,7 @@ def make_batched_env(base_env: Union[str, Callable],
                      wrappers: Iterable[Union[Type[Wrapper], WrapperAndKwargs]] = None,
                      shared_memory: bool = True,
                      num_workers: Optional[int] = None,
+                     use_fast_vector_env: bool = False,
                      **kwargs) -> VectorEnv:
     """Create a vectorized environment from multiple copies of an environment.
 
@@ -59,7 +62,17 @@ def make_batched_env(base_env: Union[str, Callable],
     wrappers : Callable or Iterable of Callables (default: `None`)
         If not `None`, then apply the wrappers to each internal environment
         during creation.
-    
+
+    use_fast_vector_env : bool (default: `False`)
+        When `True` and `base_env` is the id of a CartPole env, returns a
+        `CartPoleVectorEnv`, which steps all the envs at once with numpy
+        operations, rather than stepping one env per worker. This is only possible
+        when there are no `kwargs` and when the only `wrappers` are `TimeLimit`
+        wrappers (whose limit is then applied by the `CartPoleVectorEnv`).
+        Otherwise, a warning is issued and the usual vectorized env is returned.
+        NOTE: `num_workers` and `shared_memory` have no effect when a
+        `CartPoleVectorEnv` is returned, since it runs in the current process.
+
     **kwargs : Dict
         Keyword arguments to be passed to `gym.make` when `base_env` is an id.
 
@@ -80,7 +93,18 @@ def make_batched_env(base_env: Union[str, Callable],
           dtype=float32)
     """
     # Get the default wrappers, if needed.
-    wrappers = wrappers or []
+    wrappers = list(wrappers or [])
+
+    if use_fast_vector_env and batch_size is not None:
+        fast_env = _make_fast_vector_env(base_env, batch_size, wrappers, kwargs)
+        if fast_env is not None:
+            return fast_env
+        warnings.warn(RuntimeWarning(
+            f"Can't use a CartPoleVectorEnv for env {base_env} with wrappers "
+            f"{wrappers} and kwargs {kwargs}: it only supports the id of a CartPole "
+            f"env, with only TimeLimit wrappers and no kwargs. Using the usual "
+            f"vectorized env instead."
+        ))
     
     base_env_factory: Callable[[], gym.Env]
     if isinstance(base_env, str):
@@ -130,6 +154,38 @@ def make_batched_env(base_env: Union[str, Callable],
    
 
 
+def _make_fast_vector_env(
+    base_env: Union[str, Callable],
+    batch_size: int,
+    wrappers: List[Union[Type[Wrapper], WrapperAndKwargs]],
+    kwargs: Dict,
+) -> Optional[CartPoleVectorEnv]:
+    """ Returns a `CartPoleVectorEnv` equivalent to the batched env with the given
+    arguments, or None if it can't replace it.
+    """
+    if not isinstance(base_env, str) or kwargs:
+        return None
+    spec = gym.spec(base_env)
+    if spec.entry_point != "gym.envs.classic_control:CartPoleEnv":
+        return None
+    # The `TimeLimit` wrappers are applied by the CartPoleVectorEnv. Like with stacked
+    # `TimeLimit` wrappers, the smallest limit is the one that applies.
+    episode_limits = [spec.max_episode_steps]
+    for wrapper in wrappers:
+        if isinstance(wrapper, tuple):
+            wrapper_type, wrapper_kwargs = wrapper
+        elif isinstance(wrapper, partial) and not wrapper.args:
+            wrapper_type, wrapper_kwargs = wrapper.func, wrapper.keywords
+        else:
+            wrapper_type, wrapper_kwargs = wrapper, {}
+        if wrapper_type is not TimeLimit or set(wrapper_kwargs) != {"max_episode_steps"}:
+            return None
+        episode_limits.append(wrapper_kwargs["max_episode_steps"])
+    episode_limits = [limit for limit in episode_limits if limit is not None]
+    max_episode_steps = min(episode_limits) if episode_limits else None
+    return CartPoleVectorEnv(batch_size, max_episode_steps=max_episode_steps)
+
+
 def wrap(env: gym.Env,
          wrappers: Iterable[Union[Type[Wrapper], WrapperAndKwargs]]) -> Wrapper:
     wrappers = list(wrappers)
@@ -28,6 +28,50 @@ def test_make_batched_env(env_name: str, batch_size: int):
         assert reward.shape == (batch_size,)
 
 
+@pytest.mark.parametrize("env_name", ["CartPole-v0", "CartPole-v1"])
+def test_make_batched_env_fast_cartpole(env_name: str):
+    from sequoia.common.gym_wrappers.batch_env.fast_cartpole import CartPoleVectorEnv
+
+    env = make_batched_env(base_env=env_name, batch_size=5, use_fast_vector_env=True)
+    assert isinstance(env, CartPoleVectorEnv)
+    assert env.max_episode_steps == gym.spec(env_name).max_episode_steps
+    assert env.reset().shape == (5, 4)
+
+
+def test_make_batched_env_fast_cartpole_time_limit():
+    """ The `TimeLimit` wrappers are applied by the CartPoleVectorEnv. """
+    from functools import partial
+    from gym.wrappers import TimeLimit
+    from sequoia.common.gym_wrappers.batch_env.fast_cartpole import CartPoleVectorEnv
+
+    env = make_batched_env(
+        base_env="CartPole-v1",
+        batch_size=3,
+        wrappers=[partial(TimeLimit, max_episode_steps=50)],
+        use_fast_vector_env=True,
+    )
+    assert isinstance(env, CartPoleVectorEnv)
+    assert env.max_episode_steps == 50
+
+
+def test_make_batched_env_fast_cartpole_falls_back_with_other_wrappers():
+    """ When other wrappers are needed, warns and returns the usual vectorized env. """
+    from sequoia.common.gym_wrappers.batch_env.fast_cartpole import CartPoleVectorEnv
+    from sequoia.common.gym_wrappers import MultiTaskEnvironment
+
+    with pytest.warns(RuntimeWarning, match="CartPoleVectorEnv"):
+        env = make_batched_env(
+            base_env="CartPole-v0",
+            batch_size=2,
+            wrappers=[MultiTaskEnvironment],
+            num_workers=0,
+            use_fast_vector_env=True,
+        )
+    assert not isinstance(env, CartPoleVectorEnv)
+    assert env.reset() is not None
+    env.close()
+
+
 @pytest.mark.xfail(
     reason="Not sure that the 'id' function gives an 'absolute' memory adress, or if "
     "the address is process-relative, in which case it might be an explanation as to "
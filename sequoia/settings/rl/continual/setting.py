@@ -243,6 +243,13 @@ class ContinualRLSetting(RLSetting, ContinualAssumption):
     # The maximum number of steps per episode. When None, there is no limit.
     max_episode_steps: Optional[int] = None
 
+    # Wether to use a `CartPoleVectorEnv` for the vectorized envs, which steps all the
+    # envs at once with numpy operations. This is only possible with a CartPole env
+    # when the envs don't need other wrappers than a `TimeLimit` before batching. When
+    # that isn't the case (e.g. with a task schedule), a warning is issued and the
+    # usual vectorized env is used instead. See `make_batched_env` for more info.
+    use_fast_vector_env: bool = False
+
     # Transforms to be applied by default to the observatons of the train/valid/test
     # environments.
     transforms: List[Transforms] = list_field()
@@ -1187,12 +1194,29 @@ class ContinualRLSetting(RLSetting, ContinualAssumption):
         if batch_size is None:
             env = env_factory()
         else:
+            base_env: Union[str, Callable[[], gym.Env]] = env_factory
+            wrappers: Optional[List[Callable[[gym.Env], gym.Env]]] = None
+            base_env_kwargs: Dict = {}
+            if (
+                self.use_fast_vector_env
+                and isinstance(env_factory, partial)
+                and env_factory.func is self._make_env
+                and isinstance(env_factory.keywords.get("base_env"), str)
+            ):
+                # Pass the env id and the wrappers separately, so `make_batched_env`
+                # can tell if a `CartPoleVectorEnv` can be used.
+                base_env_kwargs = dict(env_factory.keywords)
+                base_env = base_env_kwargs.pop("base_env")
+                wrappers = base_env_kwargs.pop("wrappers", None)
             env = make_batched_env(
-                env_factory,
+                base_env,
                 batch_size=batch_size,
+                wrappers=wrappers,
                 num_workers=num_workers,
                 # TODO: Still debugging shared memory + custom spaces (e.g. Sparse).
                 shared_memory=False,
+                use_fast_vector_env=self.use_fast_vector_env,
+                **base_env_kwargs,
             )
         if max_steps:
             env = ActionLimit(env, max_steps=max_steps)
@@ -1208,7 +1232,9 @@ class ContinualRLSetting(RLSetting, ContinualAssumption):
 
         if self.prefer_tensors and self.config.device:
             # TODO: Put this before or after the image transforms?
-            env = TransformObservation(env, f=partial(move, device=self.config.device))
+            env = TransformObservation(
+                env, f=partial(move, device=self.config.device, non_blocking=True)
+            )
             env = TransformReward(env, f=partial(move, device=self.config.device))
         # # Convert the samples to tensors and move them to the right device.
         # env = ConvertToFromTensors(env)
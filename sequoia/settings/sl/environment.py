@@ -13,7 +13,6 @@ from gym.vector.utils import batch_space
 from torch import Tensor
 from torch.utils.data import DataLoader, Dataset, IterableDataset
 from torch.utils.data.dataloader import _BaseDataLoaderIter
-import matplotlib.pyplot as plt
 from sequoia.common.gym_wrappers.batch_env.tile_images import tile_images
 
 from sequoia.common.batch import Batch
@@ -9,4 +9,4 @@ from .replace import replace
 from .slicing import get_slice, set_slice
 from .stack import stack
 from .concatenate import concatenate
-from .to_from_tensor import to_tensor, from_tensor
+from .to_from_tensor import to_tensor, from_tensor, as_torch_view
@@ -11,29 +11,50 @@ V = TypeVar("V")
 
 
 @singledispatch
-def move(x: T, device: Union[str, torch.device]) -> T:
+def move(x: T, device: Union[str, torch.device], non_blocking: bool = False) -> T:
     """Moves x to the specified device if possible, else returns x unchanged.
     NOTE: This works for Tensors or any collection of Tensors.
+
+    When `non_blocking` is True, CPU tensors that are moved to a CUDA device are
+    first copied to pinned memory, so that the copy to the device is asynchronous.
+    NOTE: `non_blocking` is only passed to the `.to` method of Tensors, since the
+    `.to` methods of other objects (e.g. `Categorical`) only take a device.
     """
+    if isinstance(x, torch.Tensor) and non_blocking and device:
+        if x.device.type == "cpu" and torch.device(device).type == "cuda":
+            # NOTE: The pinned memory comes from pytorch's caching host allocator,
+            # which only reuses it once the copy to the device is done.
+            x = x.pin_memory()
+        return x.to(device=device, non_blocking=True)
     if hasattr(x, "to") and callable(x.to) and device:
         return x.to(device=device)
     return x
 
 
 @move.register(dict)
-def move_dict(x: Dict[K, V], device: Union[str, torch.device]) -> Dict[K, V]:
+def move_dict(x: Dict[K, V], device: Union[str, torch.device], non_blocking: bool = False) -> Dict[K, V]:
     return type(x)(**{
-        move(k, device): move(v, device) for k, v in x.items()
+        move(k, device, non_blocking): move(v, device, non_blocking) for k, v in x.items()
     })
 
 
 @move.register(list)
 @move.register(tuple)
 @move.register(set)
-def move_sequence(x: Sequence[T], device: Union[str, torch.device]) -> Sequence[T]:
-    return type(x)(move(v, device) for v in x)
+def move_sequence(x: Sequence[T], device: Union[str, torch.device], non_blocking: bool = False) -> Sequence[T]:
+    return type(x)(move(v, device, non_blocking) for v in x)
 
 
 @move.register(NamedTuple)
-def move_namedtuple(x: NamedTuple, device: Union[str, torch.device]) -> NamedTuple:
-    return type(x)(*[move(v, device) for v in x])
+def move_namedtuple(x: NamedTuple, device: Union[str, torch.device], non_blocking: bool = False) -> NamedTuple:
+    return type(x)(*[move(v, device, non_blocking) for v in x])
+
+
+from sequoia.common.batch import Batch
+
+
+@move.register(Batch)
+def move_batch(x: Batch, device: Union[str, torch.device], non_blocking: bool = False) -> Batch:
+    # NOTE: Moves each field with `move`, rather than calling `x.to`, which would
+    # pass `non_blocking` to the `.to` of every field.
+    return x._map(move, device, non_blocking)
@@ -0,0 +1,30 @@
+from dataclasses import dataclass
+
+import torch
+from torch import Tensor
+
+from sequoia.common.batch import Batch
+from sequoia.utils.categorical import Categorical
+
+from .move import move
+
+
+@dataclass(frozen=True)
+class ForwardPass(Batch):
+    x: Tensor
+    actions: Categorical
+
+
+def test_move_non_blocking_objects_without_non_blocking_arg():
+    """ `non_blocking` is only passed to Tensors, not to the `.to` of other objects
+    like `Categorical`, which only take a device.
+    """
+    distribution = Categorical(logits=torch.rand(3, 2))
+    moved = move(distribution, "cpu", non_blocking=True)
+    assert isinstance(moved, Categorical)
+
+    batch = ForwardPass(x=torch.rand(3, 4), actions=distribution)
+    moved_batch = move(batch, "cpu", non_blocking=True)
+    assert isinstance(moved_batch, ForwardPass)
+    assert isinstance(moved_batch.actions, Categorical)
+    assert moved_batch.x.device.type == "cpu"
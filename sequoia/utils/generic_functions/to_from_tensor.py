@@ -82,6 +82,51 @@ def _(space: TypedDictSpace[T], sample: Union[T, Mapping]) -> T:
     )
 
 
+def as_torch_view(value: Union[np.ndarray, Any]) -> Union[Tensor, Any]:
+    """ Converts a numerical numpy array into a Tensor that shares its memory when
+    possible (e.g. when the array is a view of the shared memory observation
+    buffer of a vector env), and only copies it otherwise.
+
+    Other values are returned unchanged.
+    """
+    if not isinstance(value, np.ndarray) or value.dtype.kind not in "biuf":
+        return value
+    if not value.flags.c_contiguous or not value.flags.writeable:
+        # NOTE: `torch.from_numpy` doesn't support negative strides, and warns
+        # about read-only arrays, so copy the array in these cases.
+        value = np.array(value, order="C")
+    return torch.from_numpy(value)
+
+
+def _array_to_tensor(
+    sample: Union[np.ndarray, Any], device: torch.device = None, dtype: torch.dtype = None
+) -> Union[Tensor, Any]:
+    """ Converts `sample` into a Tensor on the given device.
+
+    Numerical arrays that go to a CUDA device are first copied into pinned memory,
+    so that the copy to the device doesn't block. The pinned memory comes from
+    pytorch's caching host allocator, so it is reused across calls, and a block is
+    only reused once the copies out of it are done.
+
+    Sequences of arrays (e.g. one array per env) are stacked with numpy first, and
+    then wrapped into a single Tensor, rather than converting each array separately.
+    """
+    if (
+        isinstance(sample, (list, tuple))
+        and sample
+        and all(isinstance(v, np.ndarray) for v in sample)
+    ):
+        sample = np.stack(sample)
+    if not isinstance(sample, np.ndarray) or sample.dtype.kind not in "biuf":
+        return torch.as_tensor(sample, device=device, dtype=dtype)
+    tensor = as_torch_view(sample)
+    if device is not None and torch.device(device).type == "cuda":
+        return tensor.pin_memory().to(device=device, dtype=dtype, non_blocking=True)
+    if device is not None or dtype is not None:
+        return tensor.to(device=device, dtype=dtype)
+    return tensor
+
+
 @singledispatch
 def to_tensor(
     space: Space, sample: Union[np.ndarray, Any], device: torch.device = None
@@ -89,14 +134,14 @@ def to_tensor(
     """ Converts a sample from the given space into a Tensor. """
     if sample is None:
         return sample
-    return torch.as_tensor(sample, device=device)
+    return _array_to_tensor(sample, device=device)
 
 
 @to_tensor.register
 def _(
     space: spaces.MultiBinary, sample: np.ndarray, device: torch.device = None
 ) -> Dict[str, Union[Tensor, Any]]:
-    return torch.as_tensor(sample, device=device, dtype=torch.bool)
+    return _array_to_tensor(sample, device=device, dtype=torch.bool)
 
 
 @to_tensor.register(TypedDictSpace)
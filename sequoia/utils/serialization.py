@@ -1,5 +1,6 @@
 import inspect
 import json
+import os
 from dataclasses import asdict, dataclass, fields, is_dataclass
 from enum import Enum
 from functools import singledispatch
@@ -35,6 +36,10 @@ logger = get_logger(__file__)
 def cpu(x: Any) -> Any:
     return move(x, "cpu")
 
+# Types of values that `detach` and `cpu` leave unchanged.
+_NO_OP_TYPES = (type(None), str, int, float, bool, np.ndarray)
+
+
 class Pickleable():
     """ Helps make a class pickleable. """
     def __getstate__(self):
@@ -43,7 +48,16 @@ class Pickleable():
         """
         # We use `vars(self)` to get all the attributes, not just the fields.
         state_dict = vars(self)
-        return cpu(detach(state_dict))
+        # NOTE: Equivalent to `cpu(detach(state_dict))`, but without going through
+        # the generic functions for the values that don't need it.
+        return {
+            key: (
+                value if isinstance(value, _NO_OP_TYPES) else
+                value.detach().cpu() if isinstance(value, Tensor) else
+                cpu(detach(value))
+            )
+            for key, value in state_dict.items()
+        }
     
     def __setstate__(self, state: Dict):
         # logger.debug(f"__setstate__ was called")
@@ -65,14 +79,18 @@ class Serializable(SerializableBase, Pickleable, decode_into_subclasses=True):
         save_path_tmp = path.with_name(path.stem + "_temp" + path.suffix)
         # write out to the temp file.
         super().save(save_path_tmp, **kwargs)
+        # Flush the temp file to disk once, so the rename below can't leave a
+        # partially written file at `path`.
+        with open(save_path_tmp, "r+b") as f:
+            os.fsync(f.fileno())
         # Rename the temp file to the right path, overwriting it if it exists.
-        save_path_tmp.replace(path)
+        os.replace(save_path_tmp, path)
 
     def detach(self: S) -> S:
-        return type(self)(**detach({
-            field.name: getattr(self, field.name) for field in fields(self)
+        return type(self)(**{
+            field.name: detach(getattr(self, field.name)) for field in fields(self)
             if field.metadata.get("to_dict", True)
-        }))
+        })
 
     def to(self, device: Union[str, torch.device]):
         """Returns a new object with all the attributes 'moved' to `device`.
@@ -83,8 +101,8 @@ class Serializable(SerializableBase, Pickleable, decode_into_subclasses=True):
         numpy array to a given dtype?
         """
         return type(self)(**{
-            name: move(item, device)
-            for name, item in self.items()
+            field.name: move(getattr(self, field.name), device)
+            for field in fields(self)
         })
 
     def items(self) -> Iterable[Tuple[str, Any]]:
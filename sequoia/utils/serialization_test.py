@@ -0,0 +1,24 @@
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict
+
+from .serialization import Serializable
+
+
+@dataclass
+class TaskSchedule(Serializable):
+    schedule: Dict[int, float] = field(default_factory=dict)
+    loss: float = 0.0
+
+
+def test_save_load_json_round_trip(tmp_path: Path):
+    """ Dicts with int keys and non-finite floats survive a save/load round-trip. """
+    obj = TaskSchedule(schedule={0: 1.0, 100: 2.5}, loss=float("nan"))
+    path = tmp_path / "schedule.json"
+    obj.save(path)
+    assert not (tmp_path / "schedule_temp.json").exists()
+
+    loaded = TaskSchedule.load(path)
+    assert loaded.schedule == {0: 1.0, 100: 2.5}
+    assert math.isnan(loaded.loss)
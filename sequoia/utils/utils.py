@@ -22,6 +22,7 @@ from typing import (
     Deque,
     Dict,
     Iterable,
+    Iterator,
     List,
     MutableMapping,
     Optional,
@@ -533,6 +534,60 @@ def get_path_to_source_file(cls: Type) -> Path:
         return source_path
 
 
+class LFUCache(MutableMapping[K, V]):
+    """ Dict with a maximum size, which evicts the least frequently used entry
+    when a new key is added while it is full.
+
+    >>> cache = LFUCache(maxsize=2)
+    >>> cache["a"] = 1
+    >>> cache["b"] = 2
+    >>> cache["a"]
+    1
+    >>> cache["c"] = 3  # Evicts "b", which was never used.
+    >>> sorted(cache)
+    ['a', 'c']
+    >>> cache.hit_count["a"]
+    1
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._data: Dict[K, V] = {}
+        # Number of times each key was retrieved since it was added.
+        self.hit_count: Dict[K, int] = {}
+
+    def __getitem__(self, key: K) -> V:
+        value = self._data[key]
+        self.hit_count[key] += 1
+        return value
+
+    def __setitem__(self, key: K, value: V) -> None:
+        if key not in self._data and len(self._data) >= self.maxsize:
+            # NOTE: On ties, `min` returns the entry that was added first.
+            least_used = min(self.hit_count, key=self.hit_count.__getitem__)
+            del self[least_used]
+        self._data[key] = value
+        self.hit_count.setdefault(key, 0)
+
+    def __delitem__(self, key: K) -> None:
+        del self._data[key]
+        del self.hit_count[key]
+
+    def __contains__(self, key: Any) -> bool:
+        # NOTE: Checking for a key doesn't count as a hit.
+        return key in self._data
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.hit_count.clear()
+
+
 def constant_property(fixed_value: T) -> T:
     def constant_field(v: T, **kwargs) -> T:
         metadata = kwargs.setdefault("metadata", {})